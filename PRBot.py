@@ -1,18 +1,23 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
+import asyncio
 import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import re
 import os
-import aiohttp
-from flask import Flask
-from threading import Thread
-from rapidfuzz import fuzz, process
+import signal
+from aiohttp import web
+import gzip
+import heapq
 import io
-import httpx
-from exercise_normalization import normalize_exercise_name
-from fuzzy_matching import parse_pr_message, get_canonical_with_tiebreaker
+import json
+import math
+import time
+from functools import lru_cache
+from fuzzy_matching import parse_pr_message, looks_like_pr_message
 from core_foods_api import can_award_core_foods_xp as can_award_core_foods_xp_api, record_core_foods_checkin as record_core_foods_checkin_api, get_core_foods_counts
+from http_client import api_client, close_api_client
 
 API_BASE_URL = "https://ttm-metrics-api-production.up.railway.app/api"
 ADMIN_HEADERS = {"X-Admin-Key": os.environ.get("ADMIN_KEY", "4ifQC_DLzlXM1c5PC6egwvf2p5GgbMR3")}
@@ -21,36 +26,111 @@ ADMIN_HEADERS = {"X-Admin-Key": os.environ.get("ADMIN_KEY", "4ifQC_DLzlXM1c5PC6e
 # Disabled Feb 24, 2026 — all PR logging now goes through the dashboard which enforces canonical exercise names
 DISCORD_PR_LOGGING_ENABLED = False
 
-# Flask app for keep-alive
-app = Flask('')
-
-@app.route('/')
-def home():
-    return "Bot is alive!"
-
-def run():
-    app.run(host='0.0.0.0', port=8080)
-
-def keep_alive():
-    t = Thread(target=run)
-    t.start()
-
 # Bot setup
 intents = discord.Intents.default()
 intents.message_content = True
 bot = commands.Bot(command_prefix='!', intents=intents)
 
+# Keep-alive HTTP endpoint, served by aiohttp on the bot's own event loop
+async def home(request):
+    return web.Response(text="Bot is alive!")
+
+async def keep_alive():
+    app = web.Application()
+    app.router.add_get('/', home)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, '0.0.0.0', 8080).start()
+
+@bot.event
+async def setup_hook():
+    """Runs once before connecting to Discord (unlike on_ready, which fires on every reconnect)"""
+    await keep_alive()
+    flush_db_writes.start()
+
 # Database setup - local SQLite only for XP/logs (legacy)
 DB_NAME = '/data/pr_tracker.db'
 
-# Channel IDs
-PR_CHANNEL_ID = '1459000944028028970'
-LOGS_CHANNEL_ID = '1450903499075354756'
-CORE_FOODS_CHANNEL_ID = '1459000944028028970'
+# Channel IDs (ints, compared directly against discord's snowflake ids)
+PR_CHANNEL_ID = 1459000944028028970
+LOGS_CHANNEL_ID = 1450903499075354756
+CORE_FOODS_CHANNEL_ID = 1459000944028028970
+
+# Any of these in a PR-channel message marks it as a core foods check-in
+# Substring match on any core-foods keyword ('core foods' is covered by 'core',
+# 'checkin'/'check in' by 'check ?in'), compiled once for a single scan per message.
+# IGNORECASE spares lowercasing a copy of every message first.
+CORE_FOODS_RE = re.compile(r'core|food|ate|eating|meal|diet|nutrition|check ?in', re.IGNORECASE)
+
+# One long-lived SQLite connection shared by every helper instead of a
+# connect/close per call. It is only ever touched from the run_db thread below.
+_db_conn = None
+
+def get_db():
+    """Return the shared SQLite connection, opening it on first use"""
+    global _db_conn
+    if _db_conn is None:
+        _db_conn = sqlite3.connect(DB_NAME, check_same_thread=False)
+        # WAL + synchronous=NORMAL: commits no longer fsync the journal every time.
+        # Losing the last few XP writes on a crash is acceptable for legacy data.
+        _db_conn.execute('PRAGMA journal_mode=WAL')
+        _db_conn.execute('PRAGMA synchronous=NORMAL')
+        _db_conn.execute('PRAGMA temp_store=MEMORY')
+        _db_conn.execute('PRAGMA mmap_size=134217728')
+        # ~64 MB page cache (negative = KiB); it lives as long as the connection now
+        _db_conn.execute('PRAGMA cache_size=-64000')
+    return _db_conn
+
+# Blocking SQLite work runs on one dedicated thread so it never stalls the event
+# loop. A single worker (rather than asyncio.to_thread's shared pool) keeps every
+# use of the shared connection serialized, so XP read-modify-writes can't interleave.
+_db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sqlite')
+
+async def run_db(func, *args):
+    """Run a blocking DB helper on the SQLite thread and await its result"""
+    return await asyncio.get_running_loop().run_in_executor(_db_executor, func, *args)
+
+# XP and weekly-log writes are executed immediately (so later reads on the shared
+# connection already see them) but committed in batches, turning one commit per
+# message into at most one every DB_COMMIT_INTERVAL seconds.
+DB_COMMIT_INTERVAL = 2
+
+def commit_pending_writes():
+    """Commit the open write transaction on the shared connection, if any"""
+    if _db_conn is not None and _db_conn.in_transaction:
+        _db_conn.commit()
+
+@tasks.loop(seconds=DB_COMMIT_INTERVAL)
+async def flush_db_writes():
+    # An uncaught error would stop the loop for good and leave every later write
+    # uncommitted, so log it and let the next tick retry the same transaction
+    try:
+        await run_db(commit_pending_writes)
+    except Exception as e:
+        print(f"Error committing pending DB writes (will retry): {e}")
+
+# Per-message statements. sqlite3 caches prepared statements per connection keyed
+# on the SQL text, so reusing these on the shared connection skips re-parsing.
+# The hot helpers call conn.execute() directly rather than building a cursor first.
+SQL_SELECT_USER_XP = 'SELECT total_xp, level FROM user_xp WHERE user_id = ?'
+# Adds XP in place (no DELETE+INSERT like INSERT OR REPLACE). level isn't touched,
+# so RETURNING hands back the new total alongside the level stored before this award.
+SQL_UPSERT_USER_XP = '''
+    INSERT INTO user_xp (user_id, username, total_xp, level, last_updated)
+    VALUES (?, ?, ?, 1, ?)
+    ON CONFLICT(user_id) DO UPDATE SET
+        username = excluded.username,
+        total_xp = total_xp + excluded.total_xp,
+        last_updated = excluded.last_updated
+    RETURNING total_xp, level
+'''
+SQL_UPDATE_USER_LEVEL = 'UPDATE user_xp SET level = ? WHERE user_id = ?'
+SQL_SELECT_LAST_WEEKLY_LOG = 'SELECT timestamp FROM weekly_logs WHERE user_id = ? ORDER BY timestamp DESC LIMIT 1'
+SQL_INSERT_WEEKLY_LOG = 'INSERT INTO weekly_logs (user_id, message_id, timestamp, xp_awarded) VALUES (?, ?, ?, ?)'
 
 def init_db():
     """Initialize the database with required tables"""
-    conn = sqlite3.connect(DB_NAME)
+    conn = get_db()
     c = conn.cursor()
     
     # Legacy table - no longer written to, but kept for schema compat
@@ -88,6 +168,15 @@ def init_db():
             xp_awarded INTEGER NOT NULL
         )
     ''')
+    # can_award_weekly_log_xp looks up a user's latest log on every long message
+    c.execute('CREATE INDEX IF NOT EXISTS idx_weekly_logs_user_ts ON weekly_logs(user_id, timestamp DESC)')
+    # Content summaries count every user's logs within a date range
+    c.execute('CREATE INDEX IF NOT EXISTS idx_weekly_logs_ts ON weekly_logs(timestamp)')
+    # Leaderboard indexes cost an extra write on every XP award (each one changes
+    # total_xp) to save sorting a small table; the leaderboard cache covers that,
+    # so drop them from databases that already created them
+    c.execute('DROP INDEX IF EXISTS idx_user_xp_level')
+    c.execute('DROP INDEX IF EXISTS idx_user_xp_total')
     
     # Legacy table - core foods now go to PostgreSQL via API
     c.execute('''
@@ -103,15 +192,22 @@ def init_db():
     ''')
     
     conn.commit()
-    conn.close()
+
+# Program exercise lists per user: {user_id: (expires_at, exercises)}. Programs
+# change rarely, so consecutive PR messages reuse the list instead of refetching it.
+PROGRAM_CACHE_SECONDS = 300
+_program_cache = {}
 
 async def get_user_program_exercises(user_id):
     """
     Fetch user's program exercises from API for fuzzy matching.
     Returns list of canonical exercise names from all workouts (A, B, C, D, E).
     """
+    cached = _program_cache.get(user_id)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
     try:
-        async with httpx.AsyncClient() as client:
+        async with api_client() as client:
             response = await client.get(
                 f"{API_BASE_URL}/workouts/{user_id}",
                 timeout=5.0
@@ -122,6 +218,7 @@ async def get_user_program_exercises(user_id):
                 for workout in workouts.get('workouts', []):
                     for exercise in workout.get('exercises', []):
                         exercises.append(exercise['name'])
+                _program_cache[user_id] = (time.monotonic() + PROGRAM_CACHE_SECONDS, exercises)
                 return exercises
     except Exception as e:
         print(f"Could not fetch user program: {e}")
@@ -135,59 +232,45 @@ def calculate_1rm(weight, reps):
 
 def calculate_level(total_xp):
     """Calculate level based on total XP"""
-    level = 1
-    xp_needed = 500
-    while total_xp >= xp_needed:
-        total_xp -= xp_needed
+    if total_xp < 500:
+        return 1
+    # Invert get_total_xp_for_level's quadratic, then correct any isqrt rounding
+    level = (math.isqrt(9 + 4 * int(total_xp) // 125) - 1) // 2
+    while get_total_xp_for_level(level + 1) <= total_xp:
         level += 1
-        xp_needed = 250 + (level * 250)
+    while get_total_xp_for_level(level) > total_xp:
+        level -= 1
     return level
 
 def get_xp_for_next_level(current_level):
     """Get XP needed for next level"""
     return 250 + (current_level * 250)
 
+def get_total_xp_for_level(level):
+    """Get cumulative XP needed to reach a level (sum of get_xp_for_next_level over 1..level-1)"""
+    return 125 * (level - 1) * (level + 2)
+
 def add_xp(user_id, username, xp_amount, reason=""):
-    """Add XP to a user and check for level up"""
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute('SELECT total_xp, level FROM user_xp WHERE user_id = ?', (user_id,))
-    result = c.fetchone()
-    if result:
-        old_xp, old_level = result
-        new_xp = old_xp + xp_amount
-    else:
-        old_xp, old_level = 0, 1
-        new_xp = xp_amount
-    new_level = calculate_level(new_xp)
+    """Add XP to a user and check for level up (committed by flush_db_writes)"""
+    conn = get_db()
     timestamp = datetime.utcnow().isoformat()
-    c.execute('''
-        INSERT OR REPLACE INTO user_xp (user_id, username, total_xp, level, last_updated)
-        VALUES (?, ?, ?, ?, ?)
-    ''', (user_id, username, new_xp, new_level, timestamp))
-    conn.commit()
-    conn.close()
+    new_xp, old_level = conn.execute(SQL_UPSERT_USER_XP, (user_id, username, xp_amount, timestamp)).fetchone()
+    new_level = calculate_level(new_xp)
+    if new_level != old_level:
+        conn.execute(SQL_UPDATE_USER_LEVEL, (new_level, user_id))
     leveled_up = new_level > old_level
     return new_xp, new_level, leveled_up, old_level
 
 def get_user_xp_info(user_id):
     """Get user's XP and level information"""
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute('SELECT total_xp, level FROM user_xp WHERE user_id = ?', (user_id,))
-    result = c.fetchone()
-    conn.close()
+    result = get_db().execute(SQL_SELECT_USER_XP, (user_id,)).fetchone()
     if result:
         return result[0], result[1]
     return 0, 1
 
 def can_award_weekly_log_xp(user_id):
     """Check if user can receive weekly log XP"""
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute('SELECT timestamp FROM weekly_logs WHERE user_id = ? ORDER BY timestamp DESC LIMIT 1', (user_id,))
-    result = c.fetchone()
-    conn.close()
+    result = get_db().execute(SQL_SELECT_LAST_WEEKLY_LOG, (user_id,)).fetchone()
     if not result:
         return True
     last_log_time = datetime.fromisoformat(result[0])
@@ -195,45 +278,73 @@ def can_award_weekly_log_xp(user_id):
     return time_since_last.days >= 6
 
 def record_weekly_log(user_id, message_id, xp_awarded):
-    """Record a weekly log submission"""
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
+    """Record a weekly log submission (committed by flush_db_writes)"""
+    conn = get_db()
     timestamp = datetime.utcnow().isoformat()
-    c.execute('INSERT INTO weekly_logs (user_id, message_id, timestamp, xp_awarded) VALUES (?, ?, ?, ?)',
-              (user_id, message_id, timestamp, xp_awarded))
-    conn.commit()
-    conn.close()
+    conn.execute(SQL_INSERT_WEEKLY_LOG, (user_id, message_id, timestamp, xp_awarded))
 
-# Legacy SQLite functions kept for dump_core_foods command only
-def can_award_core_foods_xp_legacy(user_id):
-    """LEGACY - Check core foods in SQLite. Only used by dump_core_foods."""
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    today = datetime.utcnow().date().isoformat()
-    c.execute('SELECT id FROM core_foods_checkins WHERE user_id = ? AND date = ?', (user_id, today))
-    result = c.fetchone()
-    conn.close()
-    return result is None
-
-def record_core_foods_checkin_legacy(user_id, message_id, xp_awarded):
-    """LEGACY - Record core foods in SQLite. Only used by dump_core_foods."""
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    today = datetime.utcnow().date().isoformat()
-    timestamp = datetime.utcnow().isoformat()
-    try:
-        c.execute('INSERT INTO core_foods_checkins (user_id, date, message_id, timestamp, xp_awarded) VALUES (?, ?, ?, ?, ?)',
-                  (user_id, today, message_id, timestamp, xp_awarded))
-        conn.commit()
-        success = True
-    except sqlite3.IntegrityError:
-        success = False
-    conn.close()
-    return success
+def award_weekly_log(user_id, username, message_id, xp_awarded):
+    """
+    Check eligibility, add weekly log XP and record the log in one executor call.
+    Keeping the check in the same job means two logs posted back to back can't both
+    pass it, and the XP and log row always land in the same commit.
+    Returns add_xp's result, or None if the user already logged this week.
+    """
+    if not can_award_weekly_log_xp(user_id):
+        return None
+    result = add_xp(user_id, username, xp_awarded, "Weekly log")
+    record_weekly_log(user_id, message_id, xp_awarded)
+    return result
+
+LEADERBOARD_CACHE_SECONDS = 30
+
+def get_leaderboard(by_level):
+    """Get the top 10 users by level (then XP) or by total XP, cached for up to 30 seconds"""
+    return _get_leaderboard(by_level, int(time.time() // LEADERBOARD_CACHE_SECONDS))
+
+@lru_cache(maxsize=4)
+def _get_leaderboard(by_level, time_bucket):
+    """Uncached leaderboard query; time_bucket only exists to expire the cache"""
+    if by_level:
+        return get_db().execute('SELECT username, level, total_xp FROM user_xp ORDER BY level DESC, total_xp DESC LIMIT 10').fetchall()
+    return get_db().execute('SELECT username, total_xp, level FROM user_xp ORDER BY total_xp DESC LIMIT 10').fetchall()
+
+def get_content_summary_data(start_iso, end_iso):
+    """Get weekly log counts per user for the period and all users ordered by level"""
+    conn = get_db()
+    weekly_logs = dict(conn.execute('SELECT user_id, COUNT(*) as log_count FROM weekly_logs WHERE timestamp >= ? AND timestamp <= ? GROUP BY user_id', (start_iso, end_iso)).fetchall())
+    all_users = conn.execute('SELECT user_id, username, total_xp, level FROM user_xp ORDER BY level DESC').fetchall()
+    return weekly_logs, all_users
+
+def get_xp_standings_text():
+    """Get the full XP leaderboard, highest XP first, as ready-to-send text lines"""
+    # printf's ',' flag matches Python's {:,} grouping, so rows arrive already formatted
+    # Iterating the cursor steps rows one at a time instead of materializing fetchall()
+    rows = get_db().execute("SELECT printf('- %s: Level %d (%,d XP)', username, level, total_xp) FROM user_xp ORDER BY total_xp DESC")
+    return "".join(row[0] + "\n" for row in rows)
+
+def get_all_user_xp():
+    """Get every user_xp row for export, as dicts keyed by column name"""
+    cursor = get_db().cursor()
+    cursor.row_factory = sqlite3.Row
+    return [dict(row) for row in cursor.execute('SELECT user_id, username, total_xp, level FROM user_xp')]
+
+def get_legacy_core_foods_dump():
+    """Get all legacy core_foods_checkins rows, per-user counts and date range"""
+    conn = get_db()
+    rows = conn.execute('SELECT id, user_id, date, message_id, timestamp, xp_awarded FROM core_foods_checkins ORDER BY timestamp').fetchall()
+    # Per-user counts and date bounds in one grouped pass; the overall range falls out of the groups
+    per_user = conn.execute('SELECT user_id, COUNT(*), MIN(date), MAX(date) FROM core_foods_checkins GROUP BY user_id').fetchall()
+    user_counts = [(user_id, count) for user_id, count, _, _ in per_user]
+    if per_user:
+        date_range = (min(row[2] for row in per_user), max(row[3] for row in per_user))
+    else:
+        date_range = (None, None)
+    return rows, user_counts, date_range
 
 async def store_pr(user_id, username, exercise, weight, reps, estimated_1rm, message_id, channel_id):
     """Store a PR entry via API"""
-    async with httpx.AsyncClient() as client:
+    async with api_client() as client:
         try:
             response = await client.post(
                 f"{API_BASE_URL}/prs",
@@ -252,7 +363,7 @@ async def store_pr(user_id, username, exercise, weight, reps, estimated_1rm, mes
 
 async def delete_prs_by_message_api(message_id):
     """Delete all PR entries associated with a message ID via API"""
-    async with httpx.AsyncClient() as client:
+    async with api_client() as client:
         try:
             response = await client.delete(f"{API_BASE_URL}/prs/message/{message_id}", headers=ADMIN_HEADERS, timeout=10.0)
             response.raise_for_status()
@@ -264,6 +375,17 @@ async def delete_prs_by_message_api(message_id):
             print(f'❌ API error deleting PRs for message {message_id}: {e}')
             return 0
 
+async def get_pr_count_api(user_id):
+    """Get a user's lifetime PR count via API (0 if unavailable)"""
+    try:
+        async with api_client() as client:
+            response = await client.get(f"{API_BASE_URL}/prs/{user_id}/count", timeout=10.0)
+            if response.status_code == 200:
+                return response.json().get("pr_count", 0)
+    except Exception as e:
+        print(f"Error fetching PR count for level command: {e}")
+    return 0
+
 @bot.event
 async def on_ready():
     """Called when the bot is ready"""
@@ -272,14 +394,14 @@ async def on_ready():
     print(f'✅ Using NEW normalization and fuzzy matching')
     print(f'✅ All commands use API (PostgreSQL)')
     print(f'✅ Core foods check-ins use API (PostgreSQL)')
-    init_db()
+    await run_db(init_db)
 
 @bot.event
 async def on_message(message):
     """Monitor all messages in the specified channels"""
     if message.author.bot:
         return
-    channel_id = str(message.channel.id)
+    channel_id = message.channel.id
 
     # Coach messaging: detect replies to bot DMs (user dashboard reply notifications)
     if message.guild is None and message.reference and message.reference.message_id:
@@ -291,7 +413,7 @@ async def on_message(message):
                 if bot_content.startswith("**") and "**:" in bot_content:
                     display_name = bot_content.split("**")[1]
                     target_user_id = None
-                    async with httpx.AsyncClient() as client:
+                    async with api_client() as client:
                         try:
                             resp = await client.get(f"{API_BASE_URL}/dashboard/members", headers=ADMIN_HEADERS, timeout=10.0)
                             if resp.status_code == 200:
@@ -306,7 +428,7 @@ async def on_message(message):
                             print(f"❌ Error fetching members for DM coach msg: {e}")
 
                     if target_user_id:
-                        async with httpx.AsyncClient() as client:
+                        async with api_client() as client:
                             try:
                                 await client.post(
                                     f"{API_BASE_URL}/coach-messages",
@@ -339,7 +461,7 @@ async def on_message(message):
                 # Bot messages follow patterns like "{name} ate their core foods..."
                 # or "{name} just beat their last personal best..."
                 target_user_id = None
-                async with httpx.AsyncClient() as client:
+                async with api_client() as client:
                     try:
                         resp = await client.get(f"{API_BASE_URL}/dashboard/members", headers=ADMIN_HEADERS, timeout=10.0)
                         if resp.status_code == 200:
@@ -353,7 +475,7 @@ async def on_message(message):
                         print(f"❌ Error fetching members for coach msg: {e}")
 
                 if target_user_id:
-                    async with httpx.AsyncClient() as client:
+                    async with api_client() as client:
                         try:
                             await client.post(
                                 f"{API_BASE_URL}/coach-messages",
@@ -377,22 +499,22 @@ async def on_message(message):
         if message.content.strip().startswith('*'):
             await bot.process_commands(message)
             return
-        content_lower = message.content.lower()
-        core_foods_keywords = ['core foods', 'core', 'food', 'ate', 'eating', 'meal', 'diet', 'nutrition', 'check in', 'checkin']
-        is_core_foods = any(keyword in content_lower for keyword in core_foods_keywords)
+        is_core_foods = CORE_FOODS_RE.search(message.content) is not None
         if is_core_foods:
             # Use API for core foods check-ins (PostgreSQL)
             if await can_award_core_foods_xp_api(str(message.author.id)):
                 xp_earned = 200
-                add_xp(str(message.author.id), message.author.name, xp_earned, "Core foods check-in")
-                success = await record_core_foods_checkin_api(str(message.author.id), str(message.id), xp_earned)
+                _, success = await asyncio.gather(
+                    run_db(add_xp, str(message.author.id), message.author.name, xp_earned, "Core foods check-in"),
+                    record_core_foods_checkin_api(str(message.author.id), str(message.id), xp_earned),
+                )
                 if success:
-                    await message.add_reaction('🍎')
-                    await message.add_reaction('✅')
+                    await asyncio.gather(message.add_reaction('🍎'), message.add_reaction('✅'))
             else:
                 await message.add_reaction('✅')
         else:
-            if DISCORD_PR_LOGGING_ENABLED:
+            # Only fetch the user's program (an API round trip) for messages shaped like a PR
+            if DISCORD_PR_LOGGING_ENABLED and looks_like_pr_message(message.content):
                 program_exercises = await get_user_program_exercises(str(message.author.id))
                 pr_data = parse_pr_message(message.content, program_exercises)
                 if pr_data:
@@ -404,22 +526,25 @@ async def on_message(message):
                     )
                     if success:
                         xp_earned = 100
-                        add_xp(str(message.author.id), message.author.name, xp_earned, "PR logged")
-                        await message.add_reaction('💪')
+                        await asyncio.gather(
+                            run_db(add_xp, str(message.author.id), message.author.name, xp_earned, "PR logged"),
+                            message.add_reaction('💪'),
+                        )
                         fuzzy_note = " (fuzzy matched)" if pr_data['used_fuzzy'] else ""
                         print(f'Logged PR: {message.author.name} - {pr_data["canonical_exercise"]} '
                               f'{pr_data["weight"]}/{pr_data["reps"]} '
                               f'(Est. 1RM: {pr_data["estimated_1rm"]:.1f}){fuzzy_note}')
     elif channel_id == LOGS_CHANNEL_ID:
         if len(message.content) >= 300:
-            if can_award_weekly_log_xp(str(message.author.id)):
-                xp_earned = 800
-                if message.attachments:
-                    xp_earned += 50
-                add_xp(str(message.author.id), message.author.name, xp_earned, "Weekly log")
-                record_weekly_log(str(message.author.id), str(message.id), xp_earned)
-                await message.add_reaction('📝')
-                await message.add_reaction('✅')
+            xp_earned = 800
+            if message.attachments:
+                xp_earned += 50
+            awarded = await run_db(award_weekly_log, str(message.author.id), message.author.name, str(message.id), xp_earned)
+            if awarded is not None:
+                await asyncio.gather(
+                    message.add_reaction('📝'),
+                    message.add_reaction('✅'),
+                )
             else:
                 await message.add_reaction('⏰')
     await bot.process_commands(message)
@@ -428,8 +553,7 @@ async def on_message(message):
 async def on_raw_message_edit(payload: discord.RawMessageUpdateEvent):
     """Handle edited messages in the PR channel — uses raw event to work regardless of cache"""
     # payload.data is the raw gateway dict; channel_id is always present
-    channel_id = str(payload.channel_id)
-    if channel_id != PR_CHANNEL_ID:
+    if payload.channel_id != PR_CHANNEL_ID:
         return
 
     # Fetch the full message (not from cache)
@@ -450,7 +574,7 @@ async def on_raw_message_edit(payload: discord.RawMessageUpdateEvent):
         try:
             replied_to = await channel.fetch_message(message.reference.message_id)
             if replied_to.author.bot and replied_to.author.id == bot.user.id:
-                async with httpx.AsyncClient() as client:
+                async with api_client() as client:
                     try:
                         resp = await client.put(
                             f"{API_BASE_URL}/coach-messages/{message.id}",
@@ -472,8 +596,10 @@ async def on_raw_message_edit(payload: discord.RawMessageUpdateEvent):
     if message.content.strip().startswith('*'):
         return
     deleted_count = await delete_prs_by_message_api(str(message.id))
-    program_exercises = await get_user_program_exercises(str(message.author.id))
-    pr_data = parse_pr_message(message.content, program_exercises)
+    pr_data = None
+    if looks_like_pr_message(message.content):
+        program_exercises = await get_user_program_exercises(str(message.author.id))
+        pr_data = parse_pr_message(message.content, program_exercises)
     if pr_data:
         success = await store_pr(
             str(message.author.id), message.author.name,
@@ -496,7 +622,7 @@ async def on_raw_message_edit(payload: discord.RawMessageUpdateEvent):
 @bot.event
 async def on_raw_message_delete(payload):
     """Handle deleted messages - remove associated PRs via API"""
-    if str(payload.channel_id) != PR_CHANNEL_ID:
+    if payload.channel_id != PR_CHANNEL_ID:
         return
     deleted_count = await delete_prs_by_message_api(str(payload.message_id))
     if deleted_count > 0:
@@ -507,7 +633,7 @@ async def on_raw_message_delete(payload):
 async def prcount(ctx):
     """Check total number of PRs stored (via API)"""
     try:
-        async with httpx.AsyncClient() as client:
+        async with api_client() as client:
             response = await client.get(f"{API_BASE_URL}/prs/count", timeout=10.0)
             response.raise_for_status()
             data = response.json()
@@ -515,21 +641,32 @@ async def prcount(ctx):
     except Exception as e:
         await ctx.send(f"❌ Error fetching PR count: {e}")
 
+@bot.command()
+@commands.has_permissions(administrator=True)
+async def refresh_program(ctx, member: discord.Member = None):
+    """Drop cached program exercises (for one member, or everyone) so the next PR refetches them"""
+    if member:
+        _program_cache.pop(str(member.id), None)
+        await ctx.send(f"✅ Cleared cached program for {member.display_name}")
+    else:
+        _program_cache.clear()
+        await ctx.send("✅ Cleared all cached programs")
+
 @bot.command()
 async def mylatest(ctx):
     """Check your 5 most recent PRs (via API)"""
     try:
-        async with httpx.AsyncClient() as client:
+        async with api_client() as client:
             response = await client.get(f"{API_BASE_URL}/prs/{ctx.author.id}/latest?limit=5", timeout=10.0)
             response.raise_for_status()
             records = response.json()
         if records:
-            response_text = "**Your latest PRs:**\n"
+            lines = ["**Your latest PRs:**"]
             for pr in records:
                 ts = pr.get('timestamp', '')
                 date = ts[:10] if ts else 'Unknown'
-                response_text += f"• {pr['exercise']}: {pr['weight']}/{pr['reps']} (Est. 1RM: {pr['estimated_1rm']:.1f}) - {date}\n"
-            await ctx.send(response_text)
+                lines.append(f"• {pr['exercise']}: {pr['weight']}/{pr['reps']} (Est. 1RM: {pr['estimated_1rm']:.1f}) - {date}")
+            await ctx.send("\n".join(lines))
         else:
             await ctx.send("No PRs found for you yet!")
     except Exception as e:
@@ -540,7 +677,7 @@ async def progress_command(ctx):
     """Shows progress for each exercise (minimum PR vs maximum PR)"""
     user_id = str(ctx.author.id)
     try:
-        async with httpx.AsyncClient() as client:
+        async with api_client() as client:
             response = await client.get(f'{API_BASE_URL}/prs/{user_id}', timeout=10.0)
             if response.status_code != 200:
                 await ctx.send(f"❌ Error fetching PRs: {response.status_code}")
@@ -549,31 +686,50 @@ async def progress_command(ctx):
         if not prs:
             await ctx.send("No PRs found! Post your first PR to get started. 💪")
             return
-        exercise_prs = {}
+        # Single pass: fold each PR into its exercise's running aggregates instead
+        # of grouping first and re-scanning every group for each statistic
+        exercise_stats = {}
         for pr in prs:
-            exercise = pr['exercise']
-            if exercise not in exercise_prs:
-                exercise_prs[exercise] = []
-            exercise_prs[exercise].append(pr)
+            weight = pr['weight']
+            stats = exercise_stats.get(pr['exercise'])
+            if stats is None:
+                stats = exercise_stats[pr['exercise']] = {
+                    'count': 0, 'all_bw': True, 'has_bw': False, 'has_weighted': False,
+                    'min_reps': None, 'max_reps': None, 'min_1rm': None, 'max_1rm': None, 'latest': pr,
+                }
+            stats['count'] += 1
+            if weight == 0:
+                stats['has_bw'] = True
+                reps = pr['reps']
+                if stats['min_reps'] is None or reps < stats['min_reps']:
+                    stats['min_reps'] = reps
+                if stats['max_reps'] is None or reps > stats['max_reps']:
+                    stats['max_reps'] = reps
+            else:
+                stats['all_bw'] = False
+                stats['has_weighted'] = stats['has_weighted'] or weight > 0
+                est_1rm = pr['estimated_1rm']
+                if stats['min_1rm'] is None or est_1rm < stats['min_1rm']:
+                    stats['min_1rm'] = est_1rm
+                if stats['max_1rm'] is None or est_1rm > stats['max_1rm']:
+                    stats['max_1rm'] = est_1rm
+            if pr.get('timestamp', '') > stats['latest'].get('timestamp', ''):
+                stats['latest'] = pr
         lines = [f"**Progress Report for {ctx.author.display_name}**\n"]
-        for exercise in sorted(exercise_prs.keys()):
-            prs_list = exercise_prs[exercise]
-            is_bodyweight = all(pr['weight'] == 0 for pr in prs_list)
-            has_bw = any(pr['weight'] == 0 for pr in prs_list)
-            has_weighted = any(pr['weight'] > 0 for pr in prs_list)
-            is_bw_to_weighted = has_bw and has_weighted
+        for exercise in sorted(exercise_stats.keys()):
+            stats = exercise_stats[exercise]
+            is_bodyweight = stats['all_bw']
+            is_bw_to_weighted = stats['has_bw'] and stats['has_weighted']
             if is_bw_to_weighted:
                 # Mixed BW and weighted — show latest PR only, no % comparison
-                latest = max(prs_list, key=lambda x: x.get('timestamp', ''))
+                latest = stats['latest']
                 if latest['weight'] > 0:
                     lines.append(f"**{exercise}**: {latest['estimated_1rm']:.0f}lb e1RM (transitioned from bodyweight)")
                 else:
                     lines.append(f"**{exercise}**: {latest['reps']} reps (BW)")
             elif is_bodyweight:
-                min_pr = min(prs_list, key=lambda x: x['reps'])
-                max_pr = max(prs_list, key=lambda x: x['reps'])
-                min_reps = min_pr['reps']
-                max_reps = max_pr['reps']
+                min_reps = stats['min_reps']
+                max_reps = stats['max_reps']
                 if min_reps != max_reps and min_reps > 0:
                     rep_gain = max_reps - min_reps
                     pct_gain = ((max_reps - min_reps) / min_reps) * 100
@@ -581,30 +737,33 @@ async def progress_command(ctx):
                 else:
                     lines.append(f"**{exercise}**: {max_reps} reps")
             else:
-                min_pr = min(prs_list, key=lambda x: x['estimated_1rm'])
-                max_pr = max(prs_list, key=lambda x: x['estimated_1rm'])
-                min_1rm = min_pr['estimated_1rm']
-                max_1rm = max_pr['estimated_1rm']
+                min_1rm = stats['min_1rm']
+                max_1rm = stats['max_1rm']
                 if min_1rm != max_1rm and min_1rm > 0:
                     rm_gain = max_1rm - min_1rm
                     pct_gain = ((max_1rm - min_1rm) / min_1rm) * 100
                     lines.append(f"**{exercise}**: {min_1rm:.0f}lb e1RM → {max_1rm:.0f}lb e1RM ({rm_gain:+.0f}lb, {pct_gain:+.1f}%)")
                 else:
                     lines.append(f"**{exercise}**: {max_1rm:.0f}lb e1RM")
-            lines.append(f"  └ {len(prs_list)} total PRs\n")
+            lines.append(f"  └ {stats['count']} total PRs\n")
         msg_text = "\n".join(lines)
         if len(msg_text) <= 2000:
             await ctx.send(msg_text)
         else:
+            # Track each chunk's length and join its lines once, rather than
+            # growing a string with += for every line
             chunks = []
-            current_chunk = lines[0] + "\n"
+            chunk_lines = [lines[0]]
+            chunk_len = len(lines[0]) + 1
             for line in lines[1:]:
-                if len(current_chunk) + len(line) + 1 <= 1900:
-                    current_chunk += line + "\n"
+                if chunk_len + len(line) + 1 <= 1900:
+                    chunk_lines.append(line)
+                    chunk_len += len(line) + 1
                 else:
-                    chunks.append(current_chunk)
-                    current_chunk = line + "\n"
-            chunks.append(current_chunk)
+                    chunks.append("\n".join(chunk_lines) + "\n")
+                    chunk_lines = [line]
+                    chunk_len = len(line) + 1
+            chunks.append("\n".join(chunk_lines) + "\n")
             for chunk in chunks:
                 await ctx.send(chunk)
     except Exception as e:
@@ -616,24 +775,18 @@ async def progress_command(ctx):
 @bot.command()
 async def level(ctx):
     """Check your current level and XP"""
-    total_xp, level_val = get_user_xp_info(str(ctx.author.id))
-    xp_for_current = 0
-    for i in range(1, level_val):
-        xp_for_current += 250 + (i * 250)
+    # Local XP lookup and the API PR count are independent, so do both at once
+    (total_xp, level_val), pr_count = await asyncio.gather(
+        run_db(get_user_xp_info, str(ctx.author.id)),
+        get_pr_count_api(ctx.author.id),
+    )
+    xp_for_current = get_total_xp_for_level(level_val)
     xp_in_level = total_xp - xp_for_current
     xp_needed_for_next = get_xp_for_next_level(level_val)
     progress_pct = (xp_in_level / xp_needed_for_next) * 100
     bar_length = 20
     filled = int((progress_pct / 100) * bar_length)
     bar = '█' * filled + '░' * (bar_length - filled)
-    pr_count = 0
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{API_BASE_URL}/prs/{ctx.author.id}/count", timeout=10.0)
-            if response.status_code == 200:
-                pr_count = response.json().get("pr_count", 0)
-    except Exception as e:
-        print(f"Error fetching PR count for level command: {e}")
     response = f"⚔️ **Level {level_val}**\n\n"
     response += f"**XP:** {xp_in_level:,} / {xp_needed_for_next:,} ({progress_pct:.1f}%)\n"
     response += f"[{bar}]\n\n"
@@ -645,28 +798,23 @@ async def level(ctx):
 @bot.command()
 async def leaderboard(ctx, board_type: str = "level"):
     """Show leaderboards"""
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
+    results = await run_db(get_leaderboard, board_type.lower() == "level")
     if board_type.lower() == "level":
-        c.execute('SELECT username, level, total_xp FROM user_xp ORDER BY level DESC, total_xp DESC LIMIT 10')
         title = "🏆 Top 10 Levels"
     else:
-        c.execute('SELECT username, total_xp, level FROM user_xp ORDER BY total_xp DESC LIMIT 10')
         title = "🏆 Top 10 Total XP"
-    results = c.fetchall()
-    conn.close()
     if not results:
         await ctx.send("No one has earned XP yet!")
         return
-    response = f"**{title}**\n\n"
+    lines = [f"**{title}**\n\n"]
     medals = ["🥇", "🥈", "🥉"]
     for i, (username, primary, secondary) in enumerate(results, 1):
         medal = medals[i-1] if i <= 3 else f"#{i}"
         if board_type.lower() == "level":
-            response += f"{medal} **{username}** - Level {primary} ({secondary:,} XP)\n"
+            lines.append(f"{medal} **{username}** - Level {primary} ({secondary:,} XP)\n")
         else:
-            response += f"{medal} **{username}** - {primary:,} XP (Level {secondary})\n"
-    await ctx.send(response)
+            lines.append(f"{medal} **{username}** - {primary:,} XP (Level {secondary})\n")
+    await ctx.send("".join(lines))
 
 @bot.command()
 async def weekly_content(ctx):
@@ -686,7 +834,7 @@ async def _generate_content_summary(ctx, days, period_name):
     end_iso = end_date.isoformat()
     all_prs_raw = []
     try:
-        async with httpx.AsyncClient() as client:
+        async with api_client() as client:
             response = await client.get(f"{API_BASE_URL}/prs?limit=5000", timeout=15.0)
             if response.status_code == 200:
                 for pr in response.json():
@@ -696,91 +844,88 @@ async def _generate_content_summary(ctx, days, period_name):
     except Exception as e:
         await ctx.send(f"❌ Error fetching PR data from API: {e}")
         return
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute('SELECT user_id, COUNT(*) as log_count FROM weekly_logs WHERE timestamp >= ? AND timestamp <= ? GROUP BY user_id', (start_iso, end_iso))
-    weekly_logs = dict(c.fetchall())
-    c.execute('SELECT user_id, username, total_xp, level FROM user_xp ORDER BY level DESC')
-    all_users = c.fetchall()
-    conn.close()
+    weekly_logs, all_users = await run_db(get_content_summary_data, start_iso, end_iso)
     # Get core foods from API (PostgreSQL)
     core_foods = await get_core_foods_counts(start_iso, end_iso)
     if not all_prs_raw and not weekly_logs and not core_foods:
         await ctx.send(f"No activity found in the past {days} days!")
         return
     user_prs = {}
-    total_pr_count = 0
     exercise_prs = {}
     for pr in all_prs_raw:
         user_id = pr.get('user_id', '')
-        username = pr.get('username', 'Unknown')
         exercise = pr.get('exercise', '')
-        if user_id not in user_prs:
-            user_prs[user_id] = {'username': username, 'prs': [], 'pr_count': 0}
-        user_prs[user_id]['prs'].append({'exercise': exercise, 'weight': pr.get('weight', 0), 'reps': pr.get('reps', 0), 'est_1rm': pr.get('estimated_1rm', 0), 'timestamp': pr.get('timestamp', '')})
-        user_prs[user_id]['pr_count'] += 1
-        total_pr_count += 1
+        data = user_prs.get(user_id)
+        if data is None:
+            data = user_prs[user_id] = {'username': pr.get('username', 'Unknown'), 'pr_count': 0, 'samples': [], 'prs_per_day': {}, 'exercise_progress': {}}
+        data['pr_count'] += 1
+        if len(data['samples']) < 3:
+            data['samples'].append(f"{exercise} +{pr.get('weight', 0):.0f}lbs")
         exercise_prs[exercise] = exercise_prs.get(exercise, 0) + 1
+    total_pr_count = len(all_prs_raw)
+    # One chronological pass over every PR instead of sorting each member's list
+    # separately; the stable sort keeps same-timestamp PRs in API order as before
+    for pr in sorted(all_prs_raw, key=lambda x: x['timestamp']):
+        data = user_prs[pr.get('user_id', '')]
+        day = pr['timestamp'][:10]
+        data['prs_per_day'][day] = data['prs_per_day'].get(day, 0) + 1
+        ex = pr.get('exercise', '')
+        est_1rm = pr.get('estimated_1rm', 0)
+        weight = pr.get('weight', 0)
+        progress = data['exercise_progress'].get(ex)
+        if progress is None:
+            data['exercise_progress'][ex] = {'first': est_1rm, 'last': est_1rm, 'first_weight': weight, 'last_weight': weight}
+        else:
+            progress['last'] = est_1rm
+            progress['last_weight'] = weight
     standout_moments = []
-    for user_id, data in user_prs.items():
-        consecutive_days = {}
-        for pr in data['prs']:
-            day = pr['timestamp'][:10]
-            consecutive_days[day] = consecutive_days.get(day, 0) + 1
-        if consecutive_days:
-            max_in_day = max(consecutive_days.values())
-            if max_in_day >= 5:
-                standout_moments.append(f"{data['username']} hit {max_in_day} PRs in a single day")
-        exercise_progress = {}
-        for pr in sorted(data['prs'], key=lambda x: x['timestamp']):
-            ex = pr['exercise']
-            if ex not in exercise_progress:
-                exercise_progress[ex] = {'first': pr['est_1rm'], 'last': pr['est_1rm'], 'first_weight': pr['weight'], 'last_weight': pr['weight']}
-            else:
-                exercise_progress[ex]['last'] = pr['est_1rm']
-                exercise_progress[ex]['last_weight'] = pr['weight']
-        for ex, progress in exercise_progress.items():
+    for data in user_prs.values():
+        max_in_day = max(data['prs_per_day'].values())
+        if max_in_day >= 5:
+            standout_moments.append(f"{data['username']} hit {max_in_day} PRs in a single day")
+        for ex, progress in data['exercise_progress'].items():
             # Skip BW→weighted transitions
             if progress['first_weight'] == 0 and progress['last_weight'] > 0:
                 continue
             improvement = progress['last'] - progress['first']
             if improvement >= 20:
                 standout_moments.append(f"{data['username']} added +{improvement:.0f}lbs to {ex}")
-    top_users = sorted(user_prs.items(), key=lambda x: x[1]['pr_count'], reverse=True)[:5]
+    top_users = heapq.nlargest(5, user_prs.items(), key=lambda x: x[1]['pr_count'])
     active_members = len(user_prs)
     total_members = len(all_users)
-    summary = f"📊 **{period_name.upper()} SUMMARY ({start_date.strftime('%b %d')} - {end_date.strftime('%b %d')})**\n\n"
-    summary += f"👥 **ACTIVE MEMBERS:** {active_members}/{total_members} ({(active_members/max(total_members,1)*100):.0f}%)\n\n"
-    summary += f"💪 **PRS THIS {period_name.upper()}:** {total_pr_count} total\n"
+    parts = [f"📊 **{period_name.upper()} SUMMARY ({start_date.strftime('%b %d')} - {end_date.strftime('%b %d')})**\n\n"]
+    parts.append(f"👥 **ACTIVE MEMBERS:** {active_members}/{total_members} ({(active_members/max(total_members,1)*100):.0f}%)\n\n")
+    parts.append(f"💪 **PRS THIS {period_name.upper()}:** {total_pr_count} total\n")
     for user_id, data in top_users:
-        pr_samples = ", ".join([f"{pr['exercise']} +{pr['weight']:.0f}lbs" for pr in data['prs'][:3]])
-        summary += f"- {data['username']}: {data['pr_count']} PRs ({pr_samples}...)\n"
-    summary += f"\n📝 **WEEKLY LOGS:** {sum(weekly_logs.values())} submitted\n"
+        pr_samples = ", ".join(data['samples'])
+        parts.append(f"- {data['username']}: {data['pr_count']} PRs ({pr_samples}...)\n")
+    parts.append(f"\n📝 **WEEKLY LOGS:** {sum(weekly_logs.values())} submitted\n")
     if weekly_logs:
         for user_id, count in sorted(weekly_logs.items(), key=lambda x: x[1], reverse=True):
             username = user_prs.get(user_id, {}).get('username', 'Unknown')
-            summary += f"- {username}: {count} log(s)\n"
-    summary += f"\n🍽️ **CORE FOODS CHECK-INS:**\n"
+            parts.append(f"- {username}: {count} log(s)\n")
+    parts.append(f"\n🍽️ **CORE FOODS CHECK-INS:**\n")
     if core_foods:
         for user_id, count in sorted(core_foods.items(), key=lambda x: x[1], reverse=True):
             username = user_prs.get(user_id, {}).get('username', 'Unknown')
-            summary += f"- {username}: {count}/{days} days ({(count/days*100):.0f}%)\n"
+            parts.append(f"- {username}: {count}/{days} days ({(count/days*100):.0f}%)\n")
     else:
-        summary += "- No check-ins this period\n"
-    summary += f"\n🏆 **TOP XP EARNERS (ESTIMATED):**\n"
+        parts.append("- No check-ins this period\n")
+    parts.append(f"\n🏆 **TOP XP EARNERS (ESTIMATED):**\n")
     for i, (user_id, data) in enumerate(top_users, 1):
         est_xp = (data['pr_count'] * 100) + (weekly_logs.get(user_id, 0) * 800) + (core_foods.get(user_id, 0) * 200)
-        summary += f"{i}. {data['username']}: ~{est_xp:,} XP\n"
+        parts.append(f"{i}. {data['username']}: ~{est_xp:,} XP\n")
     if standout_moments:
-        summary += f"\n🔥 **STANDOUT MOMENTS:**\n"
+        parts.append(f"\n🔥 **STANDOUT MOMENTS:**\n")
         for moment in standout_moments[:5]:
-            summary += f"- {moment}\n"
+            parts.append(f"- {moment}\n")
     if exercise_prs:
-        top_exercises = sorted(exercise_prs.items(), key=lambda x: x[1], reverse=True)[:5]
-        summary += f"\n💥 **MOST POPULAR EXERCISES:**\n"
+        top_exercises = heapq.nlargest(5, exercise_prs.items(), key=lambda x: x[1])
+        parts.append(f"\n💥 **MOST POPULAR EXERCISES:**\n")
         for exercise, count in top_exercises:
-            summary += f"- {exercise}: {count} PRs\n"
-    summary += f"\n---\n\n**PASTE THIS INTO CLAUDE WITH YOUR CONTENT GENERATION PROMPT**\n"
+            parts.append(f"- {exercise}: {count} PRs\n")
+    parts.append(f"\n---\n\n**PASTE THIS INTO CLAUDE WITH YOUR CONTENT GENERATION PROMPT**\n")
+    summary = "".join(parts)
     try:
         await ctx.author.send(summary)
         await ctx.send("✅ Content summary sent to your DMs!")
@@ -797,88 +942,117 @@ async def monthly_raw(ctx):
     """Export ALL raw Discord activity from past 30 days"""
     await _export_raw_activity(ctx, days=30, period_name="Month")
 
+async def _fetch_human_messages(channel, limit, after):
+    """Get a channel's non-bot messages since `after`, oldest first ([] if no channel)"""
+    if channel is None:
+        return []
+    return [m async for m in channel.history(limit=limit, after=after, oldest_first=True) if not m.author.bot]
+
+# Exports are always sent by DM, where the upload limit doesn't follow the
+# guild's boost tier; 10 MiB is Discord's current base limit for attachments
+DM_UPLOAD_LIMIT = 10 * 1024 * 1024
+
+def _export_file(buf, filename):
+    """
+    Wrap a finished export buffer as a discord.File. The exports are read as
+    plain text, so they are only gzipped (as filename + '.gz') when they would
+    otherwise be over the DM upload limit and fail to send at all.
+    """
+    if buf.seek(0, io.SEEK_END) > DM_UPLOAD_LIMIT:
+        return discord.File(io.BytesIO(gzip.compress(buf.getvalue(), compresslevel=6)), filename=f'{filename}.gz')
+    buf.seek(0)
+    return discord.File(buf, filename=filename)
+
+# Fixed pieces of the raw export, built once instead of on every export
+_EXPORT_DIVIDER = "=" * 80
+_EXPORT_RULE = f"{_EXPORT_DIVIDER}\n\n"
+_EXPORT_PR_HEADER = f"🏋️ **#PRS CHANNEL - ALL MESSAGES**\n{_EXPORT_RULE}"
+_EXPORT_LOGS_HEADER = f"📝 **#WEEKLY-LOGS CHANNEL - ALL MESSAGES**\n{_EXPORT_RULE}"
+_EXPORT_GENERAL_HEADER = f"💬 **#GENERAL CHANNEL - ALL MESSAGES**\n{_EXPORT_RULE}"
+_EXPORT_STATS_HEADER = f"📈 **DATABASE STATISTICS**\n{_EXPORT_RULE}"
+_EXPORT_END = f"\n{_EXPORT_DIVIDER}\n**END OF RAW DATA EXPORT**\n"
+
+def _format_export_message(msg, include_attachments=False):
+    """Format one channel message for the raw export as a single string"""
+    parts = [f"[{msg.created_at:%Y-%m-%d %H:%M}] {msg.author.name}:\n{msg.content}\n"]
+    if include_attachments and msg.attachments:
+        parts.append(f"Attachments: {len(msg.attachments)} file(s)\n")
+    if msg.reactions:
+        parts.append(f"Reactions: {' '.join(f'{r.emoji}x{r.count}' for r in msg.reactions)}\n")
+    parts.append("\n")
+    return "".join(parts)
+
 async def _export_raw_activity(ctx, days, period_name):
     """Export complete raw Discord activity for Claude to analyze"""
     end_date = datetime.utcnow()
     start_date = end_date - timedelta(days=days)
-    pr_channel = bot.get_channel(int(PR_CHANNEL_ID))
-    logs_channel = bot.get_channel(int(LOGS_CHANNEL_ID))
-    general_channel = None
-    for channel in ctx.guild.text_channels:
-        if 'general' in channel.name.lower():
-            general_channel = channel
-            break
-    output = f"📊 **COMPLETE RAW ACTIVITY EXPORT - PAST {days} DAYS**\n"
-    output += f"**Period:** {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}\n"
-    output += "=" * 80 + "\n\n"
+    pr_channel = bot.get_channel(PR_CHANNEL_ID)
+    logs_channel = bot.get_channel(LOGS_CHANNEL_ID)
+    general_channel = next((channel for channel in ctx.guild.text_channels if 'general' in channel.name.lower()), None)
+    # The three histories and the local XP standings are independent, so fetch them at once
+    pr_messages, log_messages, general_messages, xp_standings = await asyncio.gather(
+        _fetch_human_messages(pr_channel, 500, start_date),
+        _fetch_human_messages(logs_channel, 200, start_date),
+        _fetch_human_messages(general_channel, 500, start_date),
+        run_db(get_xp_standings_text),
+    )
+    # Encoded straight into the file buffer piece by piece: repeated += on the growing
+    # export string re-copied it every time, and a final str would double peak memory
+    buf = io.BytesIO()
+    chars = 0
+    def write(text):
+        nonlocal chars
+        chars += len(text)
+        buf.write(text.encode('utf-8'))
+    write(f"📊 **COMPLETE RAW ACTIVITY EXPORT - PAST {days} DAYS**\n")
+    write(f"**Period:** {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}\n")
+    write(_EXPORT_RULE)
+    # Each message is encoded into the buffer as soon as it is formatted, so no
+    # formatted copy of a whole channel is built alongside the fetched Message lists
     if pr_channel:
-        output += f"🏋️ **#PRS CHANNEL - ALL MESSAGES**\n" + "=" * 80 + "\n\n"
-        pr_messages = []
-        async for message in pr_channel.history(limit=500, after=start_date):
-            if not message.author.bot:
-                pr_messages.append(message)
-        pr_messages.reverse()
+        write(_EXPORT_PR_HEADER)
         for msg in pr_messages:
-            output += f"[{msg.created_at.strftime('%Y-%m-%d %H:%M')}] {msg.author.name}:\n{msg.content}\n"
-            if msg.reactions:
-                output += f"Reactions: {' '.join([f'{r.emoji}x{r.count}' for r in msg.reactions])}\n"
-            output += "\n"
-        output += f"\nTotal PR channel messages: {len(pr_messages)}\n\n"
+            write(_format_export_message(msg))
+        write(f"\nTotal PR channel messages: {len(pr_messages)}\n\n")
     if logs_channel:
-        output += f"📝 **#WEEKLY-LOGS CHANNEL - ALL MESSAGES**\n" + "=" * 80 + "\n\n"
-        log_messages = []
-        async for message in logs_channel.history(limit=200, after=start_date):
-            if not message.author.bot:
-                log_messages.append(message)
-        log_messages.reverse()
+        write(_EXPORT_LOGS_HEADER)
         for msg in log_messages:
-            output += f"[{msg.created_at.strftime('%Y-%m-%d %H:%M')}] {msg.author.name}:\n{msg.content}\n"
-            if msg.attachments:
-                output += f"Attachments: {len(msg.attachments)} file(s)\n"
-            if msg.reactions:
-                output += f"Reactions: {' '.join([f'{r.emoji}x{r.count}' for r in msg.reactions])}\n"
-            output += "\n"
-        output += f"\nTotal weekly log messages: {len(log_messages)}\n\n"
+            write(_format_export_message(msg, include_attachments=True))
+        write(f"\nTotal weekly log messages: {len(log_messages)}\n\n")
     if general_channel:
-        output += f"💬 **#GENERAL CHANNEL - ALL MESSAGES**\n" + "=" * 80 + "\n\n"
-        general_messages = []
-        async for message in general_channel.history(limit=500, after=start_date):
-            if not message.author.bot:
-                general_messages.append(message)
-        general_messages.reverse()
+        write(_EXPORT_GENERAL_HEADER)
         for msg in general_messages:
-            output += f"[{msg.created_at.strftime('%Y-%m-%d %H:%M')}] {msg.author.name}:\n{msg.content}\n"
-            if msg.reactions:
-                output += f"Reactions: {' '.join([f'{r.emoji}x{r.count}' for r in msg.reactions])}\n"
-            output += "\n"
-        output += f"\nTotal general messages: {len(general_messages)}\n\n"
-    output += f"📈 **DATABASE STATISTICS**\n" + "=" * 80 + "\n\n"
+            write(_format_export_message(msg))
+        write(f"\nTotal general messages: {len(general_messages)}\n\n")
+    write(_EXPORT_STATS_HEADER)
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(f"{API_BASE_URL}/prs/count", timeout=10.0)
-            total_prs = resp.json().get("total_prs", 0) if resp.status_code == 200 else 0
-            resp = await client.get(f"{API_BASE_URL}/prs?limit=5000", timeout=15.0)
+        async with api_client() as client:
+            count_resp, resp = await asyncio.gather(
+                client.get(f"{API_BASE_URL}/prs/count", timeout=10.0),
+                client.get(f"{API_BASE_URL}/prs?limit=5000", timeout=15.0),
+            )
+            total_prs = count_resp.json().get("total_prs", 0) if count_resp.status_code == 200 else 0
             if resp.status_code == 200:
-                all_prs = resp.json()
-                period_prs = [p for p in all_prs if p.get('timestamp', '') >= start_date.isoformat()]
-                unique_users = len(set(p.get('user_id', '') for p in period_prs))
-                unique_exercises = len(set(p.get('exercise', '') for p in period_prs))
+                # One pass over the range, with the cutoff formatted once rather than per PR
+                start_iso = start_date.isoformat()
+                period_pr_count = 0
+                users, exercises = set(), set()
+                for p in resp.json():
+                    if p.get('timestamp', '') >= start_iso:
+                        period_pr_count += 1
+                        users.add(p.get('user_id', ''))
+                        exercises.add(p.get('exercise', ''))
+                unique_users, unique_exercises = len(users), len(exercises)
             else:
-                period_prs, unique_users, unique_exercises = [], 0, 0
-        output += f"Total PRs in database: {total_prs}\nPRs this period: {len(period_prs)}\nUnique members with PRs: {unique_users}\nUnique exercises: {unique_exercises}\n\n"
+                period_pr_count, unique_users, unique_exercises = 0, 0, 0
+        write(f"Total PRs in database: {total_prs}\nPRs this period: {period_pr_count}\nUnique members with PRs: {unique_users}\nUnique exercises: {unique_exercises}\n\n")
     except Exception as e:
-        output += f"Error fetching API stats: {e}\n\n"
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute('SELECT username, total_xp, level FROM user_xp ORDER BY total_xp DESC')
-    xp_stats = c.fetchall()
-    conn.close()
-    output += f"**Current XP Leaderboard:**\n"
-    for username, xp, lvl in xp_stats:
-        output += f"- {username}: Level {lvl} ({xp:,} XP)\n"
-    output += "\n" + "=" * 80 + "\n**END OF RAW DATA EXPORT**\n"
-    output += f"Total characters: {len(output):,}\n"
-    file = discord.File(io.BytesIO(output.encode('utf-8')), filename=f'discord_raw_export_{period_name.lower()}.txt')
+        write(f"Error fetching API stats: {e}\n\n")
+    write(f"**Current XP Leaderboard:**\n")
+    write(xp_standings)
+    write(_EXPORT_END)
+    write(f"Total characters: {chars:,}\n")
+    file = _export_file(buf, f'discord_raw_export_{period_name.lower()}.txt')
     try:
         await ctx.author.send(file=file)
         await ctx.send("✅ Raw data export sent to your DMs as a file!")
@@ -889,24 +1063,23 @@ async def _export_raw_activity(ctx, days, period_name):
 @commands.has_permissions(administrator=True)
 async def export_data(ctx):
     """Export all database data as JSON for migration (PRs from API, XP from local)"""
-    import json
     prs = []
     try:
-        async with httpx.AsyncClient() as client:
+        async with api_client() as client:
             response = await client.get(f"{API_BASE_URL}/prs?limit=10000", timeout=15.0)
             if response.status_code == 200:
                 for pr in response.json():
                     prs.append({"user_id": pr.get("user_id", ""), "username": pr.get("username", ""), "exercise": pr.get("exercise", ""), "weight": pr.get("weight", 0), "reps": pr.get("reps", 0), "estimated_1rm": pr.get("estimated_1rm", 0), "timestamp": pr.get("timestamp", "")})
     except Exception as e:
         await ctx.send(f"⚠️ Error fetching PRs from API: {e}")
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute('SELECT user_id, username, total_xp, level FROM user_xp')
-    xp = [{"user_id": r[0], "username": r[1], "total_xp": r[2], "level": r[3]} for r in c.fetchall()]
-    conn.close()
+    xp = await run_db(get_all_user_xp)
     data = {"prs": prs, "xp": xp}
-    file_content = json.dumps(data, indent=2)
-    file = discord.File(io.BytesIO(file_content.encode('utf-8')), filename='ttm_data_export.json')
+    # json.dump encodes straight into the attachment buffer, skipping the full JSON str
+    buf = io.BytesIO()
+    text = io.TextIOWrapper(buf, encoding='utf-8', newline='')
+    json.dump(data, text, indent=2)
+    text.detach()
+    file = _export_file(buf, 'ttm_data_export.json')
     await ctx.author.send(f"Exported {len(prs)} PRs (from API) and {len(xp)} XP records (from local)")
     await ctx.author.send(file=file)
     await ctx.send("✅ Data exported to your DMs!")
@@ -915,16 +1088,7 @@ async def export_data(ctx):
 @commands.has_permissions(administrator=True)
 async def dump_core_foods(ctx):
     """Dump all core_foods_checkins from local SQLite as JSON (legacy data)"""
-    import json
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute('SELECT id, user_id, date, message_id, timestamp, xp_awarded FROM core_foods_checkins ORDER BY timestamp')
-    rows = c.fetchall()
-    c.execute('SELECT user_id, COUNT(*) FROM core_foods_checkins GROUP BY user_id')
-    user_counts = c.fetchall()
-    c.execute('SELECT MIN(date), MAX(date) FROM core_foods_checkins')
-    date_range = c.fetchone()
-    conn.close()
+    rows, user_counts, date_range = await run_db(get_legacy_core_foods_dump)
     records = [{"id": r[0], "user_id": r[1], "date": r[2], "message_id": r[3], "timestamp": r[4], "xp_awarded": r[5]} for r in rows]
     data = {"total_records": len(records), "date_range": {"earliest": date_range[0], "latest": date_range[1]} if date_range[0] else None, "per_user": {uid: count for uid, count in user_counts}, "records": records}
     file_content = json.dumps(data, indent=2)
@@ -939,11 +1103,29 @@ async def dump_core_foods(ctx):
     await ctx.author.send(file=file)
     await ctx.send("✅ Core foods dump sent to your DMs!")
 
+async def run_bot(token):
+    """Run the bot, then release the shared API client and flush the last DB batch"""
+    # Railway stops the service with SIGTERM; close the bot so the finally below
+    # still commits the pending batch (add_signal_handler isn't available on Windows)
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, lambda: asyncio.ensure_future(bot.close()))
+    except NotImplementedError:
+        pass
+    try:
+        async with bot:
+            await bot.start(token)
+    finally:
+        await close_api_client()
+        await run_db(commit_pending_writes)
+
 if __name__ == '__main__':
     TOKEN = os.getenv('DISCORD_BOT_TOKEN')
     if not TOKEN:
         print("Error: DISCORD_BOT_TOKEN environment variable not set!")
         print("Set it with: set DISCORD_TOKEN=your_token_here")
     else:
-        keep_alive()
-        bot.run(TOKEN)
+        discord.utils.setup_logging()
+        try:
+            asyncio.run(run_bot(TOKEN))
+        except KeyboardInterrupt:
+            pass
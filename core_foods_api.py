@@ -2,7 +2,7 @@
 Core Foods API client functions for the Discord bot.
 Replaces local SQLite calls with API calls to PostgreSQL backend.
 """
-import httpx
+from http_client import api_client
 
 API_BASE_URL = "https://ttm-metrics-api-production.up.railway.app/api"
 
@@ -10,7 +10,7 @@ API_BASE_URL = "https://ttm-metrics-api-production.up.railway.app/api"
 async def can_award_core_foods_xp(user_id):
     """Check if user can receive core foods XP today via API"""
     try:
-        async with httpx.AsyncClient() as client:
+        async with api_client() as client:
             response = await client.get(
                 f"{API_BASE_URL}/core-foods/{user_id}/can-checkin",
                 timeout=10.0
@@ -28,7 +28,7 @@ async def can_award_core_foods_xp(user_id):
 async def record_core_foods_checkin(user_id, message_id, xp_awarded):
     """Record a core foods check-in via API (writes to PostgreSQL)"""
     try:
-        async with httpx.AsyncClient() as client:
+        async with api_client() as client:
             response = await client.post(
                 f"{API_BASE_URL}/core-foods",
                 params={
@@ -52,7 +52,7 @@ async def record_core_foods_checkin(user_id, message_id, xp_awarded):
 async def get_core_foods_counts(start_iso, end_iso):
     """Get core foods check-in counts per user for a date range via admin SQL endpoint"""
     try:
-        async with httpx.AsyncClient() as client:
+        async with api_client() as client:
             query = (
                 f"SELECT user_id, COUNT(*) as checkin_count "
                 f"FROM core_foods_checkins "
@@ -10,16 +10,347 @@ abbreviations, standardizes formatting, and removes duplicate words.
 This is the canonical normalization function. The same logic is embedded
 in scrape_and_reload.py (in ttm-metrics-api repo). Any changes here
 must be mirrored there.
+
+All patterns are compiled once at import time; normalize_exercise_name runs
+on every PR message, so it only calls methods on pre-built pattern objects.
 """
 
 import re
-from typing import Optional
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Pattern, Tuple
+
+
+def _compile_rules(rules: List[Tuple[str, str]]) -> List[Tuple[Pattern, str]]:
+    """Compile (pattern, replacement) pairs once at import time."""
+    return [(re.compile(pattern), replacement) for pattern, replacement in rules]
+
+
+def _apply_rules(exercise: str, rules: List[Tuple[Pattern, str]]) -> str:
+    """Apply compiled (pattern, replacement) rules to exercise in order."""
+    for pattern, replacement in rules:
+        exercise = pattern.sub(replacement, exercise)
+    return exercise
+
+
+def _compile_token_map(token_map: Dict[str, str]) -> Callable[[str], str]:
+    """
+    Compile a {token: replacement} map into a single word-boundary alternation,
+    so every token is expanded in one scan of the string instead of one re.sub
+    per token. Only equivalent to applying the tokens one after another when no
+    two tokens overlap in any input and no replacement, together with the text
+    around it, can form another token; tables that break this stay ordered rules.
+    """
+    alternation = '|'.join(re.escape(token) for token in sorted(token_map, key=len, reverse=True))
+    pattern = re.compile(rf'\b(?:{alternation})\b')
+    return lambda exercise: pattern.sub(lambda m: token_map[m.group()], exercise)
+
+
+# 1. PREPROCESSING
+# '.' and ',' are dropped and '-' becomes a space in one C-level translate
+_PUNCTUATION_TABLE = str.maketrans({'.': None, ',': None, '-': ' '})
+_PARENTHETICAL_RE = re.compile(r'\([^)]*\)')
+
+# 2. TYPO CORRECTIONS (word-boundary aware)
+_correct_typos = _compile_token_map({
+    'weighte': 'weighted',
+    'ex bar': 'ez bar',
+    'dumbell': 'dumbbell',
+    'barbel': 'barbell',
+    'militery': 'military',
+    'millitary': 'military',
+    'romainian': 'romanian',
+    'romaninan': 'romanian',
+    'stragiht': 'straight',
+    'skullcrusher': 'tricep extension',
+    'skullcrushers': 'tricep extension',
+})
+
+# 4. ABBREVIATION EXPANSIONS
+_expand_equipment_abbreviations = _compile_token_map({
+    'db': 'dumbbell',
+    'bb': 'barbell',
+    'bw': 'bodyweight',
+    'kb': 'kettlebell',
+    'mb': 'medicine ball',
+    'sl': 'single leg',
+    'sa': 'single arm',
+    'cs': 'chest supported',
+    'hs': 'head supported',
+    'dm': 'dumbbell',
+})
+
+_EZ_RE = re.compile(r'\bez\b')
+
+_expand_exercise_abbreviations = _compile_token_map({
+    'rdl': 'romanian deadlift',
+    'dl': 'deadlift',
+    'ohp': 'overhead press',
+    'bp': 'bench press',
+    'fs': 'front squat',
+    'bs': 'back squat',
+    'ghr': 'glute ham raise',
+    'rdf': 'rear delt fly',
+    'hspu': 'handstand pushup',
+    'er': 'external rotation',
+
+    # Arm/leg modifiers
+    'one arm': 'single arm',
+    '1 arm': 'single arm',
+    'one leg': 'single leg',
+    '1 leg': 'single leg',
+
+    # Grip conversions
+    'pronated': 'overhand',
+    'supinated': 'underhand',
+    'supine': 'lying',
+})
+
+# OH context-dependent (overhead vs overhand)
+# "oh" on either side of a pulling movement means overhand; one scan covers both orders
+_OH_PULL_CONTEXT_RE = re.compile(r'\boh\b.*\b(?:pulldown|pullup|row|curl)|\b(?:pulldown|pullup|row|curl).*\boh\b')
+_OH_RE = re.compile(r'\boh\b')
+
+# 5. EQUIPMENT SYNONYM NORMALIZATION
+_EQUIPMENT_SYNONYM_RULES = _compile_rules([
+    # UH -> underhand
+    (r'\buh\b', 'underhand'),
+
+    (r'\bsuspension trainer\b', 'trx'),
+    (r'\bsuspension\b', 'trx'),
+    (r'\bcables\b', 'cable'),
+    (r'\bez curl bar\b', 'ez bar'),
+    (r'\beasy bar\b', 'ez bar'),
+    (r'\bsmith\b(?! machine)', 'smith machine'),
+    (r'\btoe press\b', 'leg press calf raise'),
+
+    # Ball leg curl variations
+    (r'\bswiss ball leg curl\b', 'stability ball leg curl'),
+    (r'\bball leg curl\b', 'stability ball leg curl'),
+    (r'\bgliding disk leg curl\b', 'slider leg curl'),
+    (r'\bgliding leg curl\b', 'slider leg curl'),
+    (r'\btowel leg curl\b', 'slider leg curl'),
+])
+
+_BANDED_RE = re.compile(r'\bbanded\b')
+
+# 6. COMPOUND WORD NORMALIZATION
+_COMPOUND_WORDS = (
+    ('chin up', 'chinup'), ('chin ups', 'chinups'),
+    ('pull up', 'pullup'), ('pull ups', 'pullups'),
+    ('push up', 'pushup'), ('push ups', 'pushups'),
+    ('sit up', 'situp'), ('sit ups', 'situps'),
+    ('step up', 'stepup'), ('step ups', 'stepups'),
+    ('face pull', 'facepull'), ('face pulls', 'facepulls'),
+    ('push down', 'pushdown'), ('push downs', 'pushdowns'),
+    ('pull down', 'pulldown'), ('pull downs', 'pulldowns'),
+)
+
+# 7. PLURAL NORMALIZATION
+_singularize = _compile_token_map({
+    'raises': 'raise',
+    'extensions': 'extension',
+    'curls': 'curl',
+    'rows': 'row',
+    'presses': 'press',
+    'flies': 'fly',
+    'shrugs': 'shrug',
+    'squats': 'squat',
+    'lunges': 'lunge',
+    'planks': 'plank',
+    'rotations': 'rotation',
+    'mines': 'mine',
+    'pullups': 'pullup',
+    'chinups': 'chinup',
+    'pushups': 'pushup',
+    'dips': 'dip',
+    'pushdowns': 'pushdown',
+    'pulldowns': 'pulldown',
+    'facepulls': 'facepull',
+    'stepups': 'stepup',
+    'situps': 'situp',
+    'deadlifts': 'deadlift',
+    'thrusts': 'thrust',
+    'rollouts': 'rollout',
+    'bridges': 'bridge',
+    'angels': 'angel',
+    'landmines': 'landmine',
+    'hypers': 'hyper',
+    'deadbugs': 'deadbug',
+})
+
+# 8. POSITION & MODIFIER STANDARDIZATION
+_MODIFIER_RULES = _compile_rules([
+    (r'\bpause rep\b', 'paused'),
+    (r'\bunderhand grip\b', 'underhand'),
+    (r'\boverhand grip\b', 'overhand'),
+    (r'\bbody weight\b', 'bodyweight'),
+    (r'\bland mine\b', 'landmine'),
+    (r'\bglut\b', 'glute'),
+
+    # Reorder "dumbbell seated/standing/incline" to "seated/standing/incline dumbbell"
+    (r'\bdumbbell (seated|standing|incline|flat|decline)\b', r'\1 dumbbell'),
+])
+
+_BENCH_RE = re.compile(r'\bbench\b')
+
+# 9. STRIP TRAILING MODIFIERS
+_TRAILING_MODIFIER_RULES = _compile_rules([
+    (r'\s+\d+\s*second.*$', ''),
+    (r'\s+(each|per)\s+side$', ''),
+    (r'\s+x\d+$', ''),
+])
+
+# 10. EXERCISE-SPECIFIC RULES
+_LATERAL_RE = re.compile(r'\blateral(s)?\b')
+_LAT_RAISE_RE = re.compile(r'\blat raise(s)?\b')
+
+# Already a tricep extension, or a leg/back/hip/hyper/reverse one anywhere in the name
+_NON_TRICEP_EXTENSION_RE = re.compile(r'tricep|\b(?:leg|back|hip|hyper|reverse)\b')
+_EXTENSION_RE = re.compile(r'\bextension(s)?\b')
+
+_EXTENSION_RULES = _compile_rules([
+    (r'\btriceps\b', 'tricep'),
+
+    # Back extensions / hypers
+    (r'\bhyperextension\b', 'back extension'),
+    (r'\bhyper\b(?! extension)', 'back extension'),
+
+    # Reverse hyper
+    (r'\breverse hyper extension\b', 'reverse hyper'),
+    (r'\breverse hyperextension\b', 'reverse hyper'),
+])
+
+_normalize_curls_and_chest_presses = _compile_token_map({
+    # Curls
+    'biceps curl': 'bicep curl',
+    'cable curl': 'cable bicep curl',
+
+    # Presses - Chest
+    'flat bench press': 'bench press',
+    'incline press': 'incline bench press',
+    'decline press': 'decline bench press',
+})
+
+_normalize_shoulder_presses_and_rows = _compile_token_map({
+    # Presses - Shoulder
+    'shoulder press': 'military press',
+    'overhead press': 'military press',
+
+    # Rows
+    'bent over barbell row': 'barbell row',
+    'bent row': 'barbell row',
+})
+
+_normalize_dumbbell_rows = _compile_token_map({
+    'one arm dumbbell row': 'single arm dumbbell row',
+    'bent dumbbell row': 'bent over dumbbell row',
+})
+
+_normalize_pulldowns_and_pullups = _compile_token_map({
+    # Pulldowns
+    'wide grip pulldown': 'wide grip lat pulldown',
+    'wide pulldown': 'wide grip lat pulldown',
+    'close grip pulldown': 'close grip lat pulldown',
+    'close pulldown': 'close grip lat pulldown',
+
+    # Pullups/Chinups
+    'pulls': 'pullup',
+    'chins': 'chinup',
+})
+
+# Kept as ordered rules: 'kettlebell dumbbell goblet squat' relies on the first
+# rewrite producing 'kettlebell goblet squat' for the second to catch
+_SQUAT_RULES = _compile_rules([
+    (r'\bdumbbell goblet squat\b', 'goblet squat'),
+    (r'\bkettlebell goblet squat\b', 'goblet squat'),
+    (r'\bbulgarian split squat\b', 'rear foot elevated split squat'),
+])
+
+_ACCESSORY_RULES = _compile_rules([
+    # Deadlifts
+    (r'\bsumo\b(?! deadlift)', 'sumo deadlift'),
+    (r'\bhex bar deadlift\b', 'trap bar deadlift'),
+
+    # Hip thrusts
+    (r'\bbarbell hip thrust\b', 'hip thrust'),
+
+    # Dips
+    (r'\bparallel bar dip\b', 'dip'),
+
+    # Facepulls
+    (r'\bcable facepull\b', 'facepull'),
+    (r'\brope facepull\b', 'facepull'),
+
+    # Flies
+    (r'\bflye(s)?\b', 'fly'),
+    (r'\bflys\b', 'fly'),
+    (r'\bpec deck\b', 'machine fly'),
+    (r'\breverse fly\b', 'rear delt fly'),
+    (r'\bbent over fly\b', 'rear delt fly'),
+    (r'\brear fly\b', 'rear delt fly'),
+
+    # Shrugs
+    (r'\btrap shrug\b', 'shrug'),
+
+    # Calf raises
+    (r'\bcalf raises\b', 'calf raise'),
+])
+
+_normalize_ab_work = _compile_token_map({
+    # Ab work
+    'ab wheel rollout': 'ab rollout',
+    'ab wheel rotation': 'ab rollout',
+})
+
+# Kept as ordered rules: the two phrases overlap ('bar hang from bar'), and
+# the first rule must win over the whole string before the second runs
+_HANG_RULES = _compile_rules([
+    (r'\bhang from bar\b', 'dead hang'),
+    (r'\bbar hang\b', 'dead hang'),
+])
+
+_PUSHDOWN_RULES = _compile_rules([
+    (r'\bv bar pushdown\b', 'tricep pushdown'),
+    (r'\bv.bar pushdown\b', 'tricep pushdown'),
+    (r'\bv-bar pushdown\b', 'tricep pushdown'),
+    (r'\bez bar pushdown\b', 'tricep pushdown'),
+
+    (r'\bpushdowns\b', 'pushdown'),
+
+    # Good mornings
+    (r'\bbarbell good morning\b', 'good morning'),
+])
+
+_MISC_RULES = _compile_rules([
+    (r'\bstraight arm pulldown\b', 'cable pullover'),
+
+    # Machine exercises
+    (r'\bchest press machine\b', 'machine chest press'),
+
+    # External rotation
+    (r'\bext rotation\b', 'external rotation'),
+
+    # Strip tempo notation (3-1-3, etc.)
+    (r'\b\d+ \d+ \d+\b', ''),
+    (r'\b\d+-\d+-\d+\b', ''),
+])
+
+# 11. INCLINE ANGLE NORMALIZATION (presses only)
+_normalize_incline_angles = _compile_token_map({
+    '30 degree incline': 'low incline',
+    '60 degree incline': 'high incline',
+    'steep incline': 'high incline',
+    '45 degree incline': 'incline',
+})
 
 
 def normalize_exercise_name(exercise: str, weight: Optional[float] = None) -> str:
     """
     Normalize an exercise name according to Three Target Method rules.
 
+    Results are memoized: members log the same handful of exercises over and
+    over, so most calls skip the rule pipeline entirely.
+
     Args:
         exercise: Raw exercise name from user input
         weight: Weight value (used for squat disambiguation)
@@ -27,34 +358,27 @@ def normalize_exercise_name(exercise: str, weight: Optional[float] = None) -> st
     Returns:
         Normalized exercise name
     """
+    # Case and spacing never change the result, and weight only matters to the
+    # bare "squat" rule (none / zero / over 15), so fold both into the cache key.
+    if weight is not None and weight != 0:
+        weight = 16.0 if weight > 15 else 1.0
+    return _normalize_exercise_name(' '.join(exercise.lower().split()), weight)
+
+
+@lru_cache(maxsize=4096)
+def _normalize_exercise_name(exercise: str, weight: Optional[float]) -> str:
+    """Uncached rule pipeline behind normalize_exercise_name."""
 
     # Skip messages starting with * (coach comments)
     if exercise.strip().startswith('*'):
         return ""
 
     # 1. PREPROCESSING
-    exercise = exercise.lower().strip()
-    exercise = re.sub(r'\s+', ' ', exercise)
-    exercise = exercise.replace('.', '').replace(',', '')
-    exercise = re.sub(r'\([^)]*\)', '', exercise)
-    exercise = exercise.replace('-', ' ')
-    exercise = re.sub(r'\s+', ' ', exercise).strip()
+    exercise = _PARENTHETICAL_RE.sub('', exercise.lower().translate(_PUNCTUATION_TABLE))
+    exercise = ' '.join(exercise.split())
 
     # 2. TYPO CORRECTIONS (word-boundary aware)
-    typo_map = [
-        (r'\bweighte\b', 'weighted'),
-        (r'\bex bar\b', 'ez bar'),
-        (r'\bdumbell\b', 'dumbbell'),
-        (r'\bbarbel\b', 'barbell'),
-        (r'\bmilitery\b', 'military'),
-        (r'\bmillitary\b', 'military'),
-        (r'\bromainian\b', 'romanian'),
-        (r'\bromaninan\b', 'romanian'),
-        (r'\bstragiht\b', 'straight'),
-        (r'\bskullcrushers?\b', 'tricep extension'),
-    ]
-    for pattern, correction in typo_map:
-        exercise = re.sub(pattern, correction, exercise)
+    exercise = _correct_typos(exercise)
 
     # 3. STRIP "THE"
     if exercise.startswith('the '):
@@ -63,309 +387,118 @@ def normalize_exercise_name(exercise: str, weight: Optional[float] = None) -> st
     # 4. ABBREVIATION EXPANSIONS
 
     # Equipment abbreviations
-    exercise = re.sub(r'\bdb\b', 'dumbbell', exercise)
-    exercise = re.sub(r'\bbb\b', 'barbell', exercise)
-    exercise = re.sub(r'\bbw\b', 'bodyweight', exercise)
-    exercise = re.sub(r'\bkb\b', 'kettlebell', exercise)
-    exercise = re.sub(r'\bmb\b', 'medicine ball', exercise)
-    exercise = re.sub(r'\bsl\b', 'single leg', exercise)
-    exercise = re.sub(r'\bsa\b', 'single arm', exercise)
-    exercise = re.sub(r'\bcs\b', 'chest supported', exercise)
-    exercise = re.sub(r'\bhs\b', 'head supported', exercise)
-    exercise = re.sub(r'\bdm\b', 'dumbbell', exercise)
+    exercise = _expand_equipment_abbreviations(exercise)
 
     # EZ bar (if not already "ez bar")
     if 'ez' in exercise and 'ez bar' not in exercise:
-        exercise = re.sub(r'\bez\b', 'ez bar', exercise)
-
-    # Exercise abbreviations
-    exercise = re.sub(r'\brdl\b', 'romanian deadlift', exercise)
-    exercise = re.sub(r'\bdl\b', 'deadlift', exercise)
-    exercise = re.sub(r'\bohp\b', 'overhead press', exercise)
-    exercise = re.sub(r'\bbp\b', 'bench press', exercise)
-    exercise = re.sub(r'\bfs\b', 'front squat', exercise)
-    exercise = re.sub(r'\bbs\b', 'back squat', exercise)
-    exercise = re.sub(r'\bghr\b', 'glute ham raise', exercise)
-    exercise = re.sub(r'\brdf\b', 'rear delt fly', exercise)
-    exercise = re.sub(r'\bhspu\b', 'handstand pushup', exercise)
-    exercise = re.sub(r'\ber\b', 'external rotation', exercise)
-
-    # Arm/leg modifiers
-    exercise = re.sub(r'\bone arm\b', 'single arm', exercise)
-    exercise = re.sub(r'\b1 arm\b', 'single arm', exercise)
-    exercise = re.sub(r'\bone leg\b', 'single leg', exercise)
-    exercise = re.sub(r'\b1 leg\b', 'single leg', exercise)
+        exercise = _EZ_RE.sub('ez bar', exercise)
 
-    # Grip conversions
-    exercise = re.sub(r'\bpronated\b', 'overhand', exercise)
-    exercise = re.sub(r'\bsupinated\b', 'underhand', exercise)
-    exercise = re.sub(r'\bsupine\b', 'lying', exercise)
+    # Exercise abbreviations, arm/leg modifiers, grip conversions
+    exercise = _expand_exercise_abbreviations(exercise)
 
     # OH context-dependent (overhead vs overhand)
-    if re.search(r'\boh\b.*\b(pulldown|pullup|row|curl)', exercise) or \
-       re.search(r'\b(pulldown|pullup|row|curl).*\boh\b', exercise):
-        exercise = re.sub(r'\boh\b', 'overhand', exercise)
+    if _OH_PULL_CONTEXT_RE.search(exercise):
+        exercise = _OH_RE.sub('overhand', exercise)
     else:
-        exercise = re.sub(r'\boh\b', 'overhead', exercise)
-
-    # UH -> underhand
-    exercise = re.sub(r'\buh\b', 'underhand', exercise)
+        exercise = _OH_RE.sub('overhead', exercise)
 
     # 5. EQUIPMENT SYNONYM NORMALIZATION
-
-    exercise = re.sub(r'\bsuspension trainer\b', 'trx', exercise)
-    exercise = re.sub(r'\bsuspension\b', 'trx', exercise)
-    exercise = re.sub(r'\bcables\b', 'cable', exercise)
-    exercise = re.sub(r'\bez curl bar\b', 'ez bar', exercise)
-    exercise = re.sub(r'\beasy bar\b', 'ez bar', exercise)
-    exercise = re.sub(r'\bsmith\b(?! machine)', 'smith machine', exercise)
-    exercise = re.sub(r'\btoe press\b', 'leg press calf raise', exercise)
-
-    # Ball leg curl variations
-    exercise = re.sub(r'\bswiss ball leg curl\b', 'stability ball leg curl', exercise)
-    exercise = re.sub(r'\bball leg curl\b', 'stability ball leg curl', exercise)
-    exercise = re.sub(r'\bgliding disk leg curl\b', 'slider leg curl', exercise)
-    exercise = re.sub(r'\bgliding leg curl\b', 'slider leg curl', exercise)
-    exercise = re.sub(r'\btowel leg curl\b', 'slider leg curl', exercise)
+    exercise = _apply_rules(exercise, _EQUIPMENT_SYNONYM_RULES)
 
     # Band assistance
-    exercise = re.sub(r'\bband assisted\b', 'band assisted', exercise)
     if 'chinup' in exercise or 'pullup' in exercise:
-        exercise = re.sub(r'\bbanded\b', 'band assisted', exercise)
+        exercise = _BANDED_RE.sub('band assisted', exercise)
 
     # 6. COMPOUND WORD NORMALIZATION
-    compound_words = [
-        ('chin up', 'chinup'), ('chin ups', 'chinups'),
-        ('pull up', 'pullup'), ('pull ups', 'pullups'),
-        ('push up', 'pushup'), ('push ups', 'pushups'),
-        ('sit up', 'situp'), ('sit ups', 'situps'),
-        ('step up', 'stepup'), ('step ups', 'stepups'),
-        ('face pull', 'facepull'), ('face pulls', 'facepulls'),
-        ('push down', 'pushdown'), ('push downs', 'pushdowns'),
-        ('pull down', 'pulldown'), ('pull downs', 'pulldowns'),
-    ]
-    for spaced, compound in compound_words:
+    for spaced, compound in _COMPOUND_WORDS:
         exercise = exercise.replace(spaced, compound)
 
     # 7. PLURAL NORMALIZATION
-    plural_map = [
-        (r'\braises\b', 'raise'),
-        (r'\bextensions\b', 'extension'),
-        (r'\bcurls\b', 'curl'),
-        (r'\brows\b', 'row'),
-        (r'\bpresses\b', 'press'),
-        (r'\bflies\b', 'fly'),
-        (r'\bshrugs\b', 'shrug'),
-        (r'\bsquats\b', 'squat'),
-        (r'\blunges\b', 'lunge'),
-        (r'\bplanks\b', 'plank'),
-        (r'\brotations\b', 'rotation'),
-        (r'\bmines\b', 'mine'),
-        (r'\bpullups\b', 'pullup'),
-        (r'\bchinups\b', 'chinup'),
-        (r'\bpushups\b', 'pushup'),
-        (r'\bdips\b', 'dip'),
-        (r'\bpushdowns\b', 'pushdown'),
-        (r'\bpulldowns\b', 'pulldown'),
-        (r'\bfacepulls\b', 'facepull'),
-        (r'\bstepups\b', 'stepup'),
-        (r'\bsitups\b', 'situp'),
-        (r'\bdeadlifts\b', 'deadlift'),
-        (r'\bthrusts\b', 'thrust'),
-        (r'\brollouts\b', 'rollout'),
-        (r'\bbridges\b', 'bridge'),
-        (r'\bangels\b', 'angel'),
-        (r'\blandmines\b', 'landmine'),
-        (r'\bhypers\b', 'hyper'),
-        (r'\bdeadbugs\b', 'deadbug'),
-    ]
-    for pattern, replacement in plural_map:
-        exercise = re.sub(pattern, replacement, exercise)
+    exercise = _singularize(exercise)
 
     # 8. POSITION & MODIFIER STANDARDIZATION
-    exercise = re.sub(r'\bpause rep\b', 'paused', exercise)
-    exercise = re.sub(r'\bunderhand grip\b', 'underhand', exercise)
-    exercise = re.sub(r'\boverhand grip\b', 'overhand', exercise)
-    exercise = re.sub(r'\bbody weight\b', 'bodyweight', exercise)
-    exercise = re.sub(r'\bland mine\b', 'landmine', exercise)
-    exercise = re.sub(r'\bglut\b', 'glute', exercise)
-
-    # Reorder "dumbbell seated/standing/incline" to "seated/standing/incline dumbbell"
-    exercise = re.sub(r'\bdumbbell (seated|standing|incline|flat|decline)\b', r'\1 dumbbell', exercise)
+    exercise = _apply_rules(exercise, _MODIFIER_RULES)
 
     # "bench" without "press" -> "bench press"
     if exercise.endswith(' bench') and 'press' not in exercise:
         exercise = exercise + ' press'
     if 'bench' in exercise and 'press' not in exercise and 'bench press' not in exercise:
-        exercise = re.sub(r'\bbench\b', 'bench press', exercise)
+        exercise = _BENCH_RE.sub('bench press', exercise)
 
     # 9. STRIP TRAILING MODIFIERS
-    exercise = re.sub(r'\s+\d+\s*second.*$', '', exercise)
-    exercise = re.sub(r'\s+(each|per)\s+side$', '', exercise)
-    exercise = re.sub(r'\s+x\d+$', '', exercise)
+    exercise = _apply_rules(exercise, _TRAILING_MODIFIER_RULES)
 
     # 10. EXERCISE-SPECIFIC RULES
 
     # Lateral raises
     if 'lateral' in exercise and 'raise' not in exercise:
-        exercise = re.sub(r'\blateral(s)?\b', 'lateral raise', exercise)
-    exercise = re.sub(r'\blat raise(s)?\b', 'lateral raise', exercise)
+        exercise = _LATERAL_RE.sub('lateral raise', exercise)
+    exercise = _LAT_RAISE_RE.sub('lateral raise', exercise)
 
     # Extensions - add "tricep" if not leg/back/hip/hyper/reverse
-    if 'extension' in exercise and 'tricep' not in exercise:
-        if not re.search(r'\b(leg|back|hip|hyper|reverse)\b', exercise):
-            exercise = re.sub(r'\bextension(s)?\b', 'tricep extension', exercise)
+    if 'extension' in exercise and not _NON_TRICEP_EXTENSION_RE.search(exercise):
+        exercise = _EXTENSION_RE.sub('tricep extension', exercise)
 
-    exercise = re.sub(r'\btriceps\b', 'tricep', exercise)
-
-    # Back extensions / hypers
-    exercise = re.sub(r'\bhyperextension\b', 'back extension', exercise)
-    exercise = re.sub(r'\bhyper\b(?! extension)', 'back extension', exercise)
-
-    # Reverse hyper
-    exercise = re.sub(r'\breverse hyper extension\b', 'reverse hyper', exercise)
-    exercise = re.sub(r'\breverse hyperextension\b', 'reverse hyper', exercise)
+    exercise = _apply_rules(exercise, _EXTENSION_RULES)
 
     # Curls
     if exercise == 'curl' or exercise == 'curls':
         exercise = 'bicep curl'
-    exercise = re.sub(r'\bbiceps curl\b', 'bicep curl', exercise)
-    exercise = re.sub(r'\bcable curl\b', 'cable bicep curl', exercise)
-
-    # Presses - Chest
-    exercise = re.sub(r'\bflat bench press\b', 'bench press', exercise)
-    exercise = re.sub(r'\bincline press\b', 'incline bench press', exercise)
-    exercise = re.sub(r'\bdecline press\b', 'decline bench press', exercise)
+    exercise = _normalize_curls_and_chest_presses(exercise)
     if 'dumbbell' in exercise and 'press' in exercise and 'bench' not in exercise and 'military' not in exercise:
         exercise = exercise.replace('dumbbell press', 'dumbbell bench press')
 
-    # Presses - Shoulder
-    exercise = re.sub(r'\bshoulder press\b', 'military press', exercise)
-    exercise = re.sub(r'\boverhead press\b', 'military press', exercise)
-
-    # Rows
-    exercise = re.sub(r'\bbent over barbell row\b', 'barbell row', exercise)
-    exercise = re.sub(r'\bbent row\b', 'barbell row', exercise)
+    exercise = _normalize_shoulder_presses_and_rows(exercise)
 
-    if re.match(r'^dumbbell row$', exercise):
+    if exercise == 'dumbbell row':
         exercise = 'single arm dumbbell row'
-    exercise = re.sub(r'\bone arm dumbbell row\b', 'single arm dumbbell row', exercise)
-    exercise = re.sub(r'\bbent dumbbell row\b', 'bent over dumbbell row', exercise)
+    exercise = _normalize_dumbbell_rows(exercise)
 
     # Pulldowns
-    if re.match(r'^pulldown$', exercise):
+    if exercise == 'pulldown':
         exercise = 'lat pulldown'
-    exercise = re.sub(r'\bwide grip pulldown\b', 'wide grip lat pulldown', exercise)
-    exercise = re.sub(r'\bwide pulldown\b', 'wide grip lat pulldown', exercise)
-    exercise = re.sub(r'\bclose grip pulldown\b', 'close grip lat pulldown', exercise)
-    exercise = re.sub(r'\bclose pulldown\b', 'close grip lat pulldown', exercise)
-
-    # Pullups/Chinups
-    exercise = re.sub(r'\bpulls\b', 'pullup', exercise)
-    exercise = re.sub(r'\bchins\b', 'chinup', exercise)
+    exercise = _normalize_pulldowns_and_pullups(exercise)
 
     # Squats - weight-based disambiguation
-    if weight is not None and 'squat' in exercise:
-        if re.match(r'^squat$', exercise):
-            if weight == 0:
-                exercise = 'bodyweight squat'
-            elif weight > 15:
-                exercise = 'barbell back squat'
+    if weight is not None and exercise == 'squat':
+        if weight == 0:
+            exercise = 'bodyweight squat'
+        elif weight > 15:
+            exercise = 'barbell back squat'
 
-    exercise = re.sub(r'\bdumbbell goblet squat\b', 'goblet squat', exercise)
-    exercise = re.sub(r'\bkettlebell goblet squat\b', 'goblet squat', exercise)
-    exercise = re.sub(r'\bbulgarian split squat\b', 'rear foot elevated split squat', exercise)
+    exercise = _apply_rules(exercise, _SQUAT_RULES)
 
     # Deadlifts
-    if re.match(r'^deadlift$', exercise):
+    if exercise == 'deadlift':
         exercise = 'conventional deadlift'
-    exercise = re.sub(r'\bsumo\b(?! deadlift)', 'sumo deadlift', exercise)
-    exercise = re.sub(r'\bhex bar deadlift\b', 'trap bar deadlift', exercise)
-
-    # Hip thrusts
-    exercise = re.sub(r'\bbarbell hip thrust\b', 'hip thrust', exercise)
-
-    # Dips
-    exercise = re.sub(r'\bparallel bar dip\b', 'dip', exercise)
-
-    # Facepulls
-    exercise = re.sub(r'\bcable facepull\b', 'facepull', exercise)
-    exercise = re.sub(r'\brope facepull\b', 'facepull', exercise)
-
-    # Flies
-    exercise = re.sub(r'\bflye(s)?\b', 'fly', exercise)
-    exercise = re.sub(r'\bflys\b', 'fly', exercise)
-    exercise = re.sub(r'\bpec deck\b', 'machine fly', exercise)
-    exercise = re.sub(r'\breverse fly\b', 'rear delt fly', exercise)
-    exercise = re.sub(r'\bbent over fly\b', 'rear delt fly', exercise)
-    exercise = re.sub(r'\brear fly\b', 'rear delt fly', exercise)
-
-    # Shrugs
-    exercise = re.sub(r'\btrap shrug\b', 'shrug', exercise)
-
-    # Calf raises
-    exercise = re.sub(r'\bcalf raises\b', 'calf raise', exercise)
-    if re.match(r'^calf raise$', exercise):
+    exercise = _apply_rules(exercise, _ACCESSORY_RULES)
+    if exercise == 'calf raise':
         exercise = 'standing calf raise'
 
-    # Ab work
-    exercise = re.sub(r'\bab wheel rollout\b', 'ab rollout', exercise)
-    exercise = re.sub(r'\bab wheel rotation\b', 'ab rollout', exercise)
-    if re.match(r'^ab wheel$', exercise):
-        exercise = 'ab rollout'
-    if re.match(r'^rollout$', exercise):
+    exercise = _normalize_ab_work(exercise)
+    if exercise == 'ab wheel' or exercise == 'rollout':
         exercise = 'ab rollout'
 
     # Hangs
-    exercise = re.sub(r'\bhang from bar\b', 'dead hang', exercise)
-    exercise = re.sub(r'\bbar hang\b', 'dead hang', exercise)
+    exercise = _apply_rules(exercise, _HANG_RULES)
 
     # Tricep pushdowns
-    if re.match(r'^pushdown(s)?$', exercise):
+    if exercise == 'pushdown' or exercise == 'pushdowns':
         exercise = 'tricep pushdown'
-    exercise = re.sub(r'\bv bar pushdown\b', 'tricep pushdown', exercise)
-    exercise = re.sub(r'\bv.bar pushdown\b', 'tricep pushdown', exercise)
-    exercise = re.sub(r'\bv-bar pushdown\b', 'tricep pushdown', exercise)
-    exercise = re.sub(r'\bez bar pushdown\b', 'tricep pushdown', exercise)
-
-    exercise = re.sub(r'\bpushdowns\b', 'pushdown', exercise)
-
-    # Good mornings
-    exercise = re.sub(r'\bbarbell good morning\b', 'good morning', exercise)
+    exercise = _apply_rules(exercise, _PUSHDOWN_RULES)
 
     # Pullovers
-    if re.match(r'^pullover$', exercise):
+    if exercise == 'pullover':
         exercise = 'dumbbell pullover'
-    exercise = re.sub(r'\bstraight arm pulldown\b', 'cable pullover', exercise)
-
-    # Machine exercises
-    exercise = re.sub(r'\bchest press machine\b', 'machine chest press', exercise)
-
-    # External rotation
-    exercise = re.sub(r'\bext rotation\b', 'external rotation', exercise)
-
-    # Strip tempo notation (3-1-3, etc.)
-    exercise = re.sub(r'\b\d+ \d+ \d+\b', '', exercise)
-    exercise = re.sub(r'\b\d+-\d+-\d+\b', '', exercise)
+    exercise = _apply_rules(exercise, _MISC_RULES)
 
     # 11. INCLINE ANGLE NORMALIZATION (presses only)
     if 'press' in exercise:
-        exercise = re.sub(r'\b(30 degree|low) incline\b', 'low incline', exercise)
-        exercise = re.sub(r'\b(60 degree|high|steep) incline\b', 'high incline', exercise)
-        exercise = re.sub(r'\b45 degree incline\b', 'incline', exercise)
+        exercise = _normalize_incline_angles(exercise)
 
-    # 12. REMOVE DUPLICATE CONSECUTIVE WORDS
+    # 12. REMOVE DUPLICATE CONSECUTIVE WORDS (the join also collapses whitespace)
     words = exercise.split()
-    if words:
-        deduplicated = [words[0]]
-        for i in range(1, len(words)):
-            if words[i] != words[i-1]:
-                deduplicated.append(words[i])
-        exercise = ' '.join(deduplicated)
-
-    # Final cleanup
-    exercise = re.sub(r'\s+', ' ', exercise).strip()
-    return exercise
+    return ' '.join(word for word, previous in zip(words, [None] + words) if word != previous)
 
 
 if __name__ == "__main__":
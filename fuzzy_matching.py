@@ -6,11 +6,35 @@ This module matches user-typed exercise names against their assigned program
 using fuzzy string matching with the RapidFuzz library.
 """
 
-from rapidfuzz import fuzz
+import re
 from typing import List, Tuple, Optional
 from exercise_normalization import normalize_exercise_name
 
 
+# Basic pattern: exercise weight/reps or exercise BW/reps
+# More flexible pattern to handle various formats
+_PR_MESSAGE_RE = re.compile(r'^(.+?)\s+([0-9]+\.?[0-9]*|bw|BW)\s*/\s*([0-9]+)$')
+# Reps are required, so a message without an ASCII digit can never be a PR
+_DIGIT_RE = re.compile(r'[0-9]')
+
+
+def _best_program_match(normalized_input: str, program_exercises: List[str]) -> Tuple[Optional[str], float]:
+    """
+    Score every program exercise against the input in RapidFuzz's C++ loop.
+
+    extractOne only replaces its best candidate on a strictly higher score,
+    so ties resolve to the exercise that appears first in the program.
+    No score_cutoff is passed: callers need the best score even below 85.
+    """
+    # Imported on first use: with Discord PR logging disabled most runs never fuzzy match
+    from rapidfuzz import fuzz, process
+    result = process.extractOne(normalized_input, program_exercises, scorer=fuzz.ratio, processor=None)
+    if result is None:
+        return (None, 0)
+    best_match, best_score, _ = result
+    return (best_match, best_score)
+
+
 def get_canonical_exercise_name(
     user_input: str,
     program_exercises: List[str],
@@ -53,16 +77,7 @@ def get_canonical_exercise_name(
         return (normalized_input, 100, False)
     
     # Find best fuzzy match
-    best_match = None
-    best_score = 0
-    
-    for program_exercise in program_exercises:
-        # Use fuzz.ratio for similarity scoring
-        score = fuzz.ratio(normalized_input, program_exercise)
-        
-        if score > best_score:
-            best_score = score
-            best_match = program_exercise
+    best_match, best_score = _best_program_match(normalized_input, program_exercises)
     
     # Apply threshold rules
     if best_score >= threshold:
@@ -103,27 +118,13 @@ def get_canonical_with_tiebreaker(
     if normalized_input in program_exercises:
         return (normalized_input, 100, False)
     
-    # Find ALL matches at each score level
-    matches_by_score = {}
-    
-    for program_exercise in program_exercises:
-        score = fuzz.ratio(normalized_input, program_exercise)
-        
-        if score not in matches_by_score:
-            matches_by_score[score] = []
-        matches_by_score[score].append(program_exercise)
+    # Find the best match; on a tie, take the FIRST one in program order
+    # (program_exercises list is already in workout order A, B, C, D, E)
+    best_match, best_score = _best_program_match(normalized_input, program_exercises)
     
-    # Get the highest score
-    if not matches_by_score:
+    if best_match is None:
         return (normalized_input, 0, False)
     
-    best_score = max(matches_by_score.keys())
-    best_matches = matches_by_score[best_score]
-    
-    # If tie, take the FIRST one in program order
-    # (program_exercises list is already in workout order A, B, C, D, E)
-    best_match = best_matches[0]
-    
     # Apply threshold rules
     if best_score >= threshold:
         return (best_match, best_score, True)
@@ -133,6 +134,19 @@ def get_canonical_with_tiebreaker(
         return (normalized_input, best_score, False)
 
 
+def looks_like_pr_message(message: str) -> bool:
+    """
+    Cheap structural check for "exercise weight/reps" without any normalization.
+    
+    Lets callers skip fetching the user's program for ordinary chatter;
+    parse_pr_message can only succeed when this returns True.
+    """
+    if not _DIGIT_RE.search(message):
+        return False
+    stripped = message.strip()
+    return not stripped.startswith('*') and _PR_MESSAGE_RE.match(stripped) is not None
+
+
 def parse_pr_message(message: str, program_exercises: List[str]) -> Optional[dict]:
     """
     Parse a PR message from Discord into structured data.
@@ -160,16 +174,15 @@ def parse_pr_message(message: str, program_exercises: List[str]) -> Optional[dic
         }
     """
     
+    # Most channel chatter has no numbers at all; reject it before any parsing
+    if not _DIGIT_RE.search(message):
+        return None
+
     # Skip messages starting with *
     if message.strip().startswith('*'):
         return None
     
-    # Basic pattern: exercise weight/reps or exercise BW/reps
-    # More flexible pattern to handle various formats
-    pattern = r'^(.+?)\s+([0-9]+\.?[0-9]*|bw|BW)\s*/\s*([0-9]+)$'
-    
-    import re
-    match = re.match(pattern, message.strip())
+    match = _PR_MESSAGE_RE.match(message.strip())
     
     if not match:
         return None
@@ -0,0 +1,28 @@
+"""
+Shared HTTP client for the Discord bot's calls to the TTM Metrics API.
+Used by PRBot.py and core_foods_api.py.
+"""
+from contextlib import asynccontextmanager
+
+import httpx
+
+# One pooled client for every API call made by the bot, so requests reuse open
+# connections (and TLS sessions) instead of building a new client each time.
+_client = None
+
+
+@asynccontextmanager
+async def api_client():
+    """Yield the shared httpx client; unlike `async with httpx.AsyncClient()` it stays open"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient()
+    yield _client
+
+
+async def close_api_client():
+    """Close the shared client and its pooled connections (called once at shutdown)"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None